@@ -1,9 +1,11 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from contextlib import contextmanager
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
@@ -25,6 +27,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
+
+def create_missing_tables():
+    """Create tables that don't exist yet (one reflection call instead of a check per table)"""
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+    if missing:
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+    return [table.name for table in missing]
+
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -33,3 +45,29 @@ def get_db():
     finally:
         db.close()
 
+
+@lru_cache(maxsize=1)
+def get_script_engine():
+    """Engine for one-shot scripts and migrations (a single pooled connection, one spare)"""
+    return create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=1,
+        max_overflow=1,
+        echo=False
+    )
+
+
+@contextmanager
+def session_scope():
+    """Session for scripts: commits on success, rolls back on error, always closes"""
+    db = Session(bind=get_script_engine(), autoflush=False)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
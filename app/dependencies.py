@@ -3,10 +3,11 @@ FastAPI dependencies for authentication and authorization
 """
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, lambda_stmt
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.database import get_db
-from app.models import User, Worker, Company, PoliceOfficer
+from app.models import User, Worker, WorkerStatus, Company, PoliceOfficer
 from app.auth import decode_token
 
 security = HTTPBearer()
@@ -71,12 +72,18 @@ def require_role(*roles: str):
     return role_checker
 
 
+def get_worker_by_user_id(db: Session, user_id: int) -> Optional[Worker]:
+    """Load a user's worker profile with a cached (lambda) statement"""
+    stmt = lambda_stmt(lambda: select(Worker).where(Worker.user_id == user_id))
+    return db.execute(stmt).scalar_one_or_none()
+
+
 def get_current_worker(
     current_user: User = Depends(require_role("worker", "delivery_worker", "aeps_agent")),
     db: Session = Depends(get_db)
 ) -> Worker:
     """Get current worker profile"""
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     if not worker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,6 +92,27 @@ def get_current_worker(
     return worker
 
 
+def get_onboarding_worker(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Worker:
+    """Get the worker profile for onboarding steps 2-6 (must exist and not be submitted yet)"""
+    worker = get_worker_by_user_id(db, current_user.id)
+    if not worker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Please complete previous steps first"
+        )
+    
+    # Prevent re-submission if already pending verification
+    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Your application is already submitted and pending police verification."
+        )
+    return worker
+
+
 def get_current_company(
     current_user: User = Depends(require_role("company")),
     db: Session = Depends(get_db)
@@ -140,9 +168,10 @@ def create_audit_log(
     resource_type: str,
     resource_id: Optional[str],
     details: Optional[dict],
-    db: Session
+    db: Session,
+    commit: bool = True
 ):
-    """Create audit log entry"""
+    """Create audit log entry (commit=False leaves it to the caller's transaction)"""
     from app.models import AuditLog
     
     print(f"\n[AUDIT-LOG] Creating audit entry")
@@ -157,6 +186,9 @@ def create_audit_log(
         details=details
     )
     db.add(log)
+    if not commit:
+        print(f"[AUDIT-LOG] ✓ Audit entry added to current transaction")
+        return log
     db.commit()
     print(f"[AUDIT-LOG] ✓ Audit entry created (ID: {log.id})")
 
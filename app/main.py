@@ -1,14 +1,15 @@
 """
 Jan Suraksha Backend - Main FastAPI Application
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
+import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from app.database import engine, Base
+from app.database import create_missing_tables
 from app.routers import (
     auth_router,
     workers_router,
@@ -18,6 +19,8 @@ from app.routers import (
     admin_router
 )
 
+logging.basicConfig(level=logging.INFO)
+
 print("\n" + "="*80)
 print("JAN SURAKSHA BACKEND STARTING")
 print("="*80)
@@ -26,8 +29,8 @@ print("="*80 + "\n")
 
 # Create database tables
 print("[STARTUP] Creating database tables...")
-Base.metadata.create_all(bind=engine)
-print("[STARTUP] Database tables created successfully\n")
+created_tables = create_missing_tables()
+print(f"[STARTUP] Database tables ready ({len(created_tables)} created)\n")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,7 +38,8 @@ app = FastAPI(
     description="National Last-Mile Trust & Verification Platform",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Create uploads directory if it doesn't exist
@@ -46,6 +50,50 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 print("[STARTUP] Mounted /uploads directory for static files")
 
+# Reject oversized request bodies before they are read or parsed.
+# Largest legitimate body is a base64 selfie (10 MB decoded) plus JSON framing.
+MAX_REQUEST_BODY_BYTES = 16 * 1024 * 1024
+
+
+class LimitRequestBodyMiddleware:
+    """
+    413 for bodies over max_bytes: up front from Content-Length, or while the
+    body is streamed (chunked uploads have no Content-Length). Registered
+    before CORSMiddleware so the 413 still carries CORS headers.
+    """
+    
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            await response(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPException from body parsing as-is
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+        
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(LimitRequestBodyMiddleware, max_bytes=MAX_REQUEST_BODY_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
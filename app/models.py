@@ -1,14 +1,23 @@
 """
 Database models for Jan Suraksha platform
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, Enum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, Enum, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
 
+try:
+    from enum import StrEnum
+except ImportError:  # Python < 3.11
+    class StrEnum(str, enum.Enum):
+        def __str__(self):
+            return self.value
 
-class UserRole(str, enum.Enum):
+        __format__ = str.__format__
+
+
+class UserRole(StrEnum):
     WORKER = "worker"
     DELIVERY_WORKER = "delivery_worker"
     AEPS_AGENT = "aeps_agent"
@@ -17,19 +26,19 @@ class UserRole(str, enum.Enum):
     ADMIN = "admin"
 
 
-class WorkerCategory(str, enum.Enum):
+class WorkerCategory(StrEnum):
     DELIVERY_WORKER = "delivery_worker"
     AEPS_AGENT = "aeps_agent"
 
 
-class VerificationStatus(str, enum.Enum):
+class VerificationStatus(StrEnum):
     PENDING = "pending"
     VERIFIED = "verified"
     REJECTED = "rejected"
     EXPIRED = "expired"
 
 
-class WorkerStatus(str, enum.Enum):
+class WorkerStatus(StrEnum):
     ACTIVE = "active"
     INACTIVE = "inactive"
     SUSPENDED = "suspended"
@@ -37,7 +46,7 @@ class WorkerStatus(str, enum.Enum):
     PENDING_VERIFICATION = "pending_verification"
 
 
-class ComplaintCategory(str, enum.Enum):
+class ComplaintCategory(StrEnum):
     FRAUD = "fraud"
     MISBEHAVIOR = "misbehavior"
     MISUSE = "misuse"
@@ -45,7 +54,7 @@ class ComplaintCategory(str, enum.Enum):
     OTHER = "other"
 
 
-class ComplaintStatus(str, enum.Enum):
+class ComplaintStatus(StrEnum):
     OPEN = "open"
     INVESTIGATING = "investigating"
     RESOLVED = "resolved"
@@ -141,7 +150,7 @@ class Worker(Base):
     
     # Onboarding progress
     onboarding_step = Column(Integer, default=1)
-    onboarding_data = Column(JSON, nullable=True)  # Store step-wise data
+    onboarding_data = Column(JSON, nullable=False, default=dict)  # Store step-wise data
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -154,6 +163,10 @@ class Worker(Base):
     company_links = relationship("WorkerCompanyLink", back_populates="worker")
 
 
+# regenerate_qr_codes looks up verified workers that still have no QR code
+Index("ix_workers_verified_qr", Worker.verification_status, Worker.qr_code_url)
+
+
 class Company(Base):
     """Company/Platform that employs workers"""
     __tablename__ = "companies"
@@ -277,6 +290,10 @@ class PoliceVerification(Base):
     officer = relationship("PoliceOfficer", back_populates="verifications")
 
 
+# Latest-verification lookups filter by worker and order by newest first
+Index("ix_pv_worker_created", PoliceVerification.worker_id, PoliceVerification.created_at.desc())
+
+
 class Complaint(Base):
     """Complaints against workers"""
     __tablename__ = "complaints"
@@ -364,6 +381,13 @@ class OTPVerification(Base):
     verified_at = Column(DateTime(timezone=True), nullable=True)
 
 
+# OTP verification matches on code + purpose and the contact; cleanup scans by expiry
+Index("ix_otp_lookup", OTPVerification.otp_code, OTPVerification.purpose)
+Index("ix_otp_email", OTPVerification.email)
+Index("ix_otp_mobile", OTPVerification.mobile)
+Index("ix_otp_expires_at", OTPVerification.expires_at)
+
+
 class AuditLog(Base):
     """Audit trail for all actions"""
     __tablename__ = "audit_logs"
@@ -1,7 +1,7 @@
 """
 Authentication routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.database import get_db
@@ -21,7 +21,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/request-otp")
-async def request_otp(request: OTPRequest, db: Session = Depends(get_db)):
+async def request_otp(request: OTPRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Request OTP for email or mobile"""
     print(f"\n[AUTH] OTP Request - Email: {request.email}, Mobile: {request.mobile}, Purpose: {request.purpose}")
     try:
@@ -41,14 +41,18 @@ async def request_otp(request: OTPRequest, db: Session = Depends(get_db)):
                     detail="Mobile number already registered"
                 )
         
-        # Generate and send OTP
+        # Generate OTP now, send it after the response
         otp = otp_service.create_otp(
             db=db,
             email=request.email,
             mobile=request.mobile,
             purpose=request.purpose
         )
-        print(f"[AUTH] OTP Generated and Sent: {otp}")
+        background_tasks.add_task(
+            otp_service.deliver_otp, otp,
+            email=request.email, mobile=request.mobile, purpose=request.purpose
+        )
+        print(f"[AUTH] OTP Generated (delivery queued): {otp}")
         
         return {
             "success": True,
@@ -107,24 +111,25 @@ async def verify_otp(request: OTPVerify, db: Session = Depends(get_db)):
 
 
 @router.post("/resend-otp")
-async def resend_otp(request: dict, db: Session = Depends(get_db)):
+async def resend_otp(request: dict, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Resend OTP"""
     email = request.get("email")
     mobile = request.get("mobile")
     purpose = request.get("purpose", "email_verification")
     
-    otp_service.create_otp(
+    otp = otp_service.create_otp(
         db=db,
         email=email,
         mobile=mobile,
         purpose=purpose
     )
+    background_tasks.add_task(otp_service.deliver_otp, otp, email=email, mobile=mobile, purpose=purpose)
     
     return {"success": True, "message": "OTP resent successfully"}
 
 
 @router.post("/signup")
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+async def signup(request: SignupRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """User signup - Returns TokenResponse or verification required message"""
     print(f"\n[AUTH] Signup Request - Name: {request.full_name}, Role: {request.role}, Email: {request.email}, Mobile: {request.mobile}")
     # Validation
@@ -213,7 +218,8 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     if request.email and not request.mobile:
         # Send verification email
         print(f"[AUTH] Email signup - sending verification OTP to {request.email}")
-        otp_service.create_otp(db=db, email=request.email, purpose="email_verification")
+        otp = otp_service.create_otp(db=db, email=request.email, purpose="email_verification")
+        background_tasks.add_task(otp_service.deliver_otp, otp, email=request.email, purpose="email_verification")
         
         return {
             "requires_verification": True,
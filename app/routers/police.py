@@ -3,25 +3,33 @@ Police verification and management routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime, timedelta
+import asyncio
 from app.database import get_db
 from app.models import (
     PoliceOfficer, PoliceVerification, Worker, Incident, User,
-    VerificationStatus, WorkerStatus, WorkerActivity
+    VerificationStatus, WorkerStatus, WorkerCategory, WorkerActivity
 )
 from app.schemas import (
     PoliceVerificationCreate, PoliceVerificationResponse,
     FaceVerificationRequest, FaceVerificationResponse,
-    IncidentCreate
+    FaceVerificationBatchRequest, FaceVerificationBatchItem,
+    IncidentCreate, serialize_activities
 )
 from app.dependencies import get_current_user, get_current_police_officer, create_audit_log
-from app.services.face_verification import face_verification_service
+from app.services.face_verification import face_verification_service, validate_image_url
 from app.services.qr_service import qr_service
-from app.services.aws_rekognition import rekognition_service
+from app.services.aws_rekognition import AWSRekognitionService, get_rekognition_service
 from app.auth import generate_worker_id
 
 router = APIRouter(prefix="/police", tags=["Police"])
 
+# Enum -> string lookups so list endpoints skip the per-row .value access
+_CATEGORY_VALUES = {c: c.value for c in WorkerCategory}
+_STATUS_VALUES = {s: s.value for s in WorkerStatus}
+_VERIFICATION_VALUES = {v: v.value for v in VerificationStatus}
+
 
 @router.post("/regenerate-qr/{worker_id}")
 async def regenerate_qr_code(
@@ -54,7 +62,7 @@ async def regenerate_qr_code(
     
     # Regenerate QR code (even if already exists)
     try:
-        worker.qr_code_url = qr_service.generate_worker_qr(worker.worker_id)
+        worker.qr_code_url = qr_service.generate_worker_qr(worker.worker_id, overwrite=True)
         worker.verification_endpoint = qr_service.generate_verification_endpoint(worker.worker_id)
         db.commit()
         
@@ -279,18 +287,20 @@ async def get_verification_queue(
     result = []
     for worker in workers:
         user = db.query(User).filter(User.id == worker.user_id).first()
+        verification_status = worker.verification_status
+        category = worker.category
         
         # Map worker verification_status to frontend status
-        if worker.verification_status == VerificationStatus.VERIFIED:
+        if verification_status == VerificationStatus.VERIFIED:
             status = "approved"
-        elif worker.verification_status == VerificationStatus.REJECTED:
+        elif verification_status == VerificationStatus.REJECTED:
             status = "rejected"
         else:
             status = "pending"
         
         # Only show worker_id if police verified (security measure)
         display_worker_id = None
-        if worker.verification_status == VerificationStatus.VERIFIED and worker.worker_id:
+        if status == "approved" and worker.worker_id:
             display_worker_id = worker.worker_id
         else:
             display_worker_id = "Pending Verification"
@@ -305,7 +315,7 @@ async def get_verification_queue(
                 "full_name": user.full_name if user else "Unknown",
                 "mobile": user.mobile if user else "N/A",
                 "email": user.email if user else "N/A",
-                "category": worker.category.value if worker.category else "Unknown",
+                "category": category or "Unknown",
                 "city": worker.city or "N/A",
                 "state": worker.state or "N/A",
                 "address": worker.address_current or "N/A",
@@ -339,9 +349,9 @@ async def search_workers(
             "worker_id": worker.worker_id,
             "full_name": user.full_name if user else "Unknown",
             "mobile": user.mobile if user else None,
-            "category": worker.category.value,
-            "status": worker.status.value,
-            "verification_status": worker.verification_status.value,
+            "category": _CATEGORY_VALUES[worker.category],
+            "status": _STATUS_VALUES[worker.status],
+            "verification_status": _VERIFICATION_VALUES[worker.verification_status],
             "risk_score": worker.risk_score
         })
     
@@ -378,11 +388,14 @@ async def get_worker_by_internal_id(
         Complaint.worker_id == worker.id
     ).order_by(Complaint.created_at.desc()).all()
     
-    print(f"[POLICE] Worker found: {user.full_name if user else 'Unknown'} - Category: {worker.category.value if worker.category else 'N/A'}")
+    category = worker.category
+    is_verified = worker.verification_status == VerificationStatus.VERIFIED
+    
+    print(f"[POLICE] Worker found: {user.full_name if user else 'Unknown'} - Category: {category or 'N/A'}")
     
     # Only show worker_id if police verified (security measure)
     display_worker_id = None
-    if worker.verification_status == VerificationStatus.VERIFIED and worker.worker_id:
+    if is_verified and worker.worker_id:
         display_worker_id = worker.worker_id
     else:
         display_worker_id = "Pending Verification"
@@ -395,23 +408,23 @@ async def get_worker_by_internal_id(
             "email": user.email if user else None,
             "mobile": user.mobile if user else None
         },
-        "category": worker.category.value if worker.category else None,
+        "category": category,
         "address": worker.address_current,
         "city": worker.city,
         "state": worker.state,
         "pincode": worker.pincode,
         "aadhaar_reference": worker.aadhaar_reference,
         "selfie_url": worker.selfie_url,
-        "status": worker.status.value if worker.status else None,
-        "verification_status": worker.verification_status.value if worker.verification_status else None,
+        "status": worker.status,
+        "verification_status": worker.verification_status,
         "risk_score": worker.risk_score,
         "complaint_count": worker.complaint_count,
         "onboarding_step": worker.onboarding_step,
         "onboarding_data": worker.onboarding_data,
         "submitted_at": worker.updated_at.isoformat() if worker.updated_at else worker.created_at.isoformat(),
         # QR Code and Verification - ADDED
-        "qr_code_url": worker.qr_code_url if worker.verification_status == VerificationStatus.VERIFIED else None,
-        "verification_endpoint": worker.verification_endpoint if worker.verification_status == VerificationStatus.VERIFIED else None,
+        "qr_code_url": worker.qr_code_url if is_verified else None,
+        "verification_endpoint": worker.verification_endpoint if is_verified else None,
         # AePS specific fields
         "bank_affiliation": worker.bank_affiliation,
         "bc_affiliation": worker.bc_affiliation,
@@ -537,10 +550,19 @@ async def verify_worker_face(
             detail="Worker selfie not available"
         )
     
+    try:
+        validate_image_url(data.live_face_image_url)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid live face image URL: {str(e)}"
+        )
+    
     try:
         # Perform face verification
         print(f"[POLICE] Performing face verification for worker: {worker.worker_id}")
-        is_match, match_score, is_live = face_verification_service.verify_worker_face(
+        is_match, match_score, is_live = await asyncio.to_thread(
+            face_verification_service.verify_worker_face,
             worker.selfie_url,
             data.live_face_image_url
         )
@@ -595,11 +617,107 @@ async def verify_worker_face(
         )
 
 
+@router.post("/verify-face/batch", response_model=list[FaceVerificationBatchItem])
+async def verify_worker_faces_batch(
+    data: FaceVerificationBatchRequest,
+    officer: PoliceOfficer = Depends(get_current_police_officer),
+    db: Session = Depends(get_db)
+):
+    """Perform face verification for several workers at once (results in request order)"""
+    print(f"\n[POLICE] Batch Face Verification Request - Officer ID: {officer.id}, Items: {len(data.items)}")
+    for index, item in enumerate(data.items):
+        try:
+            validate_image_url(item.live_face_image_url)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid live face image URL (item {index}): {str(e)}"
+            )
+    
+    worker_ids = {item.worker_id for item in data.items}
+    workers = {w.id: w for w in db.query(Worker).filter(Worker.id.in_(worker_ids))}
+    
+    results: list[FaceVerificationBatchItem | None] = [None] * len(data.items)
+    pending = []  # (index, worker, live image url) still to be verified
+    for index, item in enumerate(data.items):
+        worker = workers.get(item.worker_id)
+        if not worker:
+            results[index] = FaceVerificationBatchItem(worker_id=item.worker_id, error="Worker not found")
+        elif not worker.selfie_url:
+            results[index] = FaceVerificationBatchItem(worker_id=item.worker_id, error="Worker selfie not available")
+        else:
+            pending.append((index, worker, item.live_face_image_url))
+    
+    outcomes = await face_verification_service.verify_workers_batch(
+        [(worker.selfie_url, live_url) for _, worker, live_url in pending]
+    )
+    
+    # Reuse this officer's open verification records for the batch in one query
+    verified_ids = [worker.id for (_, worker, _), outcome in zip(pending, outcomes)
+                    if not isinstance(outcome, BaseException)]
+    open_verifications = {
+        v.worker_id: v for v in db.query(PoliceVerification).filter(
+            PoliceVerification.worker_id.in_(verified_ids),
+            PoliceVerification.officer_id == officer.id,
+            PoliceVerification.status == VerificationStatus.PENDING
+        )
+    } if verified_ids else {}
+    
+    for (index, worker, _), outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"[POLICE] ✗ Face verification failed for worker {worker.id}: {outcome}")
+            results[index] = FaceVerificationBatchItem(worker_id=worker.id, error=f"Face verification failed: {outcome}")
+            continue
+        
+        is_match, match_score, is_live = outcome
+        verification = open_verifications.get(worker.id)
+        if not verification:
+            verification = PoliceVerification(
+                worker_id=worker.id,
+                officer_id=officer.id,
+                status=VerificationStatus.PENDING
+            )
+            db.add(verification)
+            open_verifications[worker.id] = verification
+        
+        verification.face_match_score = match_score
+        verification.face_match_performed = True
+        verification.liveness_check = is_live
+        
+        create_audit_log(
+            user_id=officer.user_id,
+            action="face_verification",
+            resource_type="worker",
+            resource_id=worker.id,
+            details={
+                "match_score": match_score,
+                "is_match": is_match,
+                "is_live": is_live
+            },
+            db=db,
+            commit=False
+        )
+        results[index] = FaceVerificationBatchItem(
+            worker_id=worker.id,
+            result=FaceVerificationResponse(
+                match_score=match_score,
+                is_match=is_match,
+                liveness_detected=is_live,
+                confidence=match_score
+            )
+        )
+    
+    db.commit()
+    print(f"[POLICE] ✓ Batch face verification complete - {len(verified_ids)}/{len(data.items)} verified")
+    return results
+
+
 @router.post("/verify")
 async def create_verification(
     data: PoliceVerificationCreate,
     officer: PoliceOfficer = Depends(get_current_police_officer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rekognition_service: AWSRekognitionService = Depends(get_rekognition_service)
 ):
     """Create or update police verification"""
     print(f"\n[POLICE] Verification Request - Officer ID: {officer.id}, Worker ID: {data.worker_id}, Status: {data.status}")
@@ -642,7 +760,7 @@ async def create_verification(
         
         # Generate QR Code ONLY when verified by police
         if not worker.qr_code_url:
-            worker.qr_code_url = qr_service.generate_worker_qr(worker.worker_id)
+            worker.qr_code_url = qr_service.generate_worker_qr(worker.worker_id, overwrite=True)
             worker.verification_endpoint = qr_service.generate_verification_endpoint(worker.worker_id)
             print(f"[POLICE] ✅ QR Code Generated for verified worker: {worker.worker_id}")
             print(f"[POLICE] QR Code Path: {worker.qr_code_url}")
@@ -650,17 +768,19 @@ async def create_verification(
         # Index face in AWS Rekognition ONLY when verified by police
         if worker.selfie_url and rekognition_service.client:
             print(f"[REKOGNITION] Indexing face for worker: {worker.worker_id}")
-            success, face_data, error = rekognition_service.index_face(
+            success, face_data, error = await asyncio.to_thread(
+                rekognition_service.index_face,
                 image_path=worker.selfie_url,
                 worker_id=worker.worker_id
             )
             
             if success:
                 # Store face_id in worker record for future reference
-                if not worker.onboarding_data:
-                    worker.onboarding_data = {}
-                worker.onboarding_data['face_id'] = face_data['face_id']
-                worker.onboarding_data['face_confidence'] = face_data['confidence']
+                data_map = dict(worker.onboarding_data)
+                data_map['face_id'] = face_data['face_id']
+                data_map['face_confidence'] = face_data['confidence']
+                worker.onboarding_data = data_map
+                flag_modified(worker, "onboarding_data")
                 print(f"[REKOGNITION] ✅ Face indexed successfully. FaceID: {face_data['face_id']}")
             else:
                 print(f"[REKOGNITION] ⚠️ Face indexing failed: {error}")
@@ -760,11 +880,7 @@ async def log_incident(
             detail="Worker not found"
         )
     
-    # Generate incident number
-    incident_number = f"INC-{datetime.now().year}-{datetime.now().strftime('%m%d%H%M%S')}"
-    
     incident = Incident(
-        incident_number=incident_number,
         worker_id=worker.id,
         officer_id=officer.id,
         title=data.title,
@@ -777,6 +893,11 @@ async def log_incident(
     )
     
     db.add(incident)
+    db.flush()
+    
+    # Generate incident number from the auto-increment id (unique per row)
+    incident_number = f"INC-{datetime.now().year}-{incident.id:08d}"
+    incident.incident_number = incident_number
     
     # Update risk score based on severity
     severity_scores = {"low": 5, "medium": 15, "high": 30, "critical": 50}
@@ -868,45 +989,12 @@ async def get_worker_activities_by_police(
     
     print(f"[POLICE] Found {len(activities)} activities for worker ID: {worker.id}")
     
-    # Format activities based on type
-    result = []
-    for activity in activities:
-        activity_data = {
-            "id": activity.id,
-            "activity_type": activity.activity_type,
-            "activity_date": activity.activity_date.isoformat(),
-            "location": activity.location,
-            "city": activity.city,
-            "state": activity.state,
-            "pincode": activity.pincode,
-            "status": activity.status,
-            "notes": activity.notes
-        }
-        
-        # Add type-specific fields
-        if activity.activity_type == "delivery":
-            activity_data.update({
-                "package_id": activity.package_id,
-                "delivery_partner": activity.delivery_partner,
-                "package_type": activity.package_type,
-                "recipient_name": activity.recipient_name,
-                "recipient_contact": activity.recipient_contact
-            })
-        elif activity.activity_type == "transaction":
-            activity_data.update({
-                "customer_name": activity.customer_name,
-                "customer_contact": activity.customer_contact,
-                "transaction_type": activity.transaction_type,
-                "transaction_amount": activity.transaction_amount,
-                "bank_name": activity.bank_name
-            })
-        
-        result.append(activity_data)
+    result = serialize_activities(activities)
     
     return {
         "activities": result,
         "total": len(result),
-        "worker_category": worker.category.value if worker.category else None,
+        "worker_category": worker.category,
         "worker_id": worker.worker_id,
         "worker_name": db.query(User).filter(User.id == worker.user_id).first().full_name if db.query(User).filter(User.id == worker.user_id).first() else "Unknown"
     }
@@ -916,7 +1004,8 @@ async def get_worker_activities_by_police(
 async def search_worker_by_face(
     data: dict,
     officer: PoliceOfficer = Depends(get_current_police_officer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rekognition_service: AWSRekognitionService = Depends(get_rekognition_service)
 ):
     """
     Search for workers by face (Police only)
@@ -960,7 +1049,8 @@ async def search_worker_by_face(
     
     # Search for matching faces
     print(f"[FACE-SEARCH] Searching with threshold: {threshold}%")
-    success, matches, error = rekognition_service.search_face_by_base64(
+    success, matches, error = await asyncio.to_thread(
+        rekognition_service.search_face_by_base64,
         base64_image=base64_image,
         threshold=threshold,
         max_faces=max_results
@@ -999,9 +1089,9 @@ async def search_worker_by_face(
                 "worker_id": worker.worker_id,
                 "full_name": user.full_name if user else "Unknown",
                 "mobile_number": user.mobile if user else "Unknown",
-                "category": worker.category.value if worker.category else "Unknown",
-                "verification_status": worker.verification_status.value if worker.verification_status else "Unknown",
-                "status": worker.status.value if worker.status else "Unknown",
+                "category": worker.category or "Unknown",
+                "verification_status": worker.verification_status or "Unknown",
+                "status": worker.status or "Unknown",
                 "city": worker.city,
                 "state": worker.state,
                 "selfie_url": worker.selfie_url,
@@ -1048,7 +1138,8 @@ async def search_worker_by_face(
 @router.get("/rekognition/stats")
 async def get_rekognition_stats(
     officer: PoliceOfficer = Depends(get_current_police_officer),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rekognition_service: AWSRekognitionService = Depends(get_rekognition_service)
 ):
     """Get AWS Rekognition collection statistics (Police only)"""
     print(f"\n[REKOGNITION] Stats requested by officer ID: {officer.id}")
@@ -1059,7 +1150,7 @@ async def get_rekognition_stats(
             detail="Face recognition service is not configured"
         )
     
-    stats = rekognition_service.get_collection_stats()
+    stats = await asyncio.to_thread(rekognition_service.get_collection_stats)
     
     if not stats:
         raise HTTPException(
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Worker, User, Company
 from app.schemas import VerifyWorkerRequest, VerifyWorkerResponse
+from app.dependencies import get_worker_by_user_id
 
 router = APIRouter(prefix="/verify", tags=["Verification"])
 
@@ -28,7 +29,7 @@ async def verify_worker(
     elif data.mobile:
         user = db.query(User).filter(User.mobile == data.mobile).first()
         if user:
-            worker = db.query(Worker).filter(Worker.user_id == user.id).first()
+            worker = get_worker_by_user_id(db, user.id)
     elif data.qr_data:
         # Extract worker_id from QR data
         # Format: https://jansuraksha.gov.in/verify?id=WORKER_ID
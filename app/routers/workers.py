@@ -1,30 +1,107 @@
 """
 Worker onboarding and management routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy import update, func, and_, not_, case
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from datetime import datetime, timedelta
-import base64
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pybase64
 import os
-import uuid
 from pathlib import Path
 from app.database import get_db
 from app.models import Worker, WorkerCategory, WorkerStatus, VerificationStatus, User, WorkerActivity
 from app.schemas import (
     WorkerOnboardingStep1, WorkerOnboardingStep2, WorkerOnboardingStep3,
     WorkerOnboardingStep4, WorkerOnboardingStep5, WorkerOnboardingStep6,
-    WorkerOnboardComplete, WorkerResponse, WorkerDetailResponse
+    WorkerOnboardComplete, WorkerResponse, WorkerDetailResponse, serialize_activities
+)
+from app.dependencies import (
+    get_current_user, get_current_worker, get_onboarding_worker, get_worker_by_user_id, create_audit_log
 )
-from app.dependencies import get_current_user, get_current_worker, create_audit_log
 from app.auth import generate_worker_id
 from app.services.qr_service import qr_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/workers", tags=["Workers"])
 
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = Path("uploads/selfies")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Selfie size limits - checked before decoding so oversized payloads fail fast
+MAX_SELFIE_BYTES = 10 * 1024 * 1024
+MAX_SELFIE_BASE64_CHARS = 4 * ((MAX_SELFIE_BYTES + 2) // 3) + 256  # + data URI prefix
+
+# Dedicated pool for selfie decode + disk writes so upload bursts don't starve
+# the default executor used by other blocking calls
+_SELFIE_WRITER = ThreadPoolExecutor(max_workers=4, thread_name_prefix="selfie-writer")
+
+# (Worker attribute, label) pairs that must be filled before onboarding can complete
+_REQUIRED_ONBOARDING_FIELDS = (
+    ("category", "category (step 1)"),
+    ("address_current", "address (step 2)"),
+    ("city", "city (step 2)"),
+    ("state", "state (step 2)"),
+    ("pincode", "pincode (step 2)"),
+    ("selfie_url", "selfie (step 3)"),
+    ("aadhaar_reference", "aadhaar (step 4)"),
+)
+
+# (status, label, description) lookups for /verification/status
+_ONBOARDING_COMPLETED = ("completed", "COMPLETED", "Registration process completed")
+_ONBOARDING_IN_PROGRESS = ("in_progress", "IN PROGRESS")
+_ONBOARDING_NOT_STARTED = ("not_started", "NOT STARTED", "Start your registration")
+_POLICE_STATUS = {
+    VerificationStatus.VERIFIED: ("verified", "VERIFIED", "Background check completed"),
+    VerificationStatus.REJECTED: ("rejected", "REJECTED", "Verification rejected"),
+}
+_POLICE_PENDING = ("pending", "PENDING", "Background check by law enforcement")
+_POLICE_NOT_STARTED = ("not_started", "NOT STARTED", "Awaiting onboarding completion")
+_FACE_VERIFIED = ("verified", "VERIFIED", "Biometric facial recognition")
+_FACE_FAILED = ("failed", "FAILED", "Biometric verification failed")
+_FACE_PENDING = ("pending", "PENDING", "Biometric facial recognition")
+_FACE_NOT_STARTED = ("not_started", "NOT STARTED", "Awaiting submission")
+
+
+def save_image_bytes(image_data, worker_id: int) -> str:
+    """
+    Write already-decoded image bytes to disk and return the file path.
+    
+    Args:
+        image_data: Raw image bytes (bytes, bytearray or memoryview)
+        worker_id: Worker ID for organizing files
+        
+    Returns:
+        Relative file path to the saved image
+    """
+    # Generate unique filename
+    filename = f"worker_{worker_id}_{os.urandom(4).hex()}.jpg"
+    filepath = UPLOAD_DIR / filename
+    
+    # Save the file with a raw fd; no BufferedWriter for a single large write
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        mv = memoryview(image_data)
+        # Reserve the final size up front so large files are allocated contiguously
+        if mv.nbytes and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, mv.nbytes)
+            except OSError:
+                pass  # Not supported by this filesystem; the write still succeeds
+        while mv:
+            written = os.write(fd, mv)
+            mv = mv[written:]
+    finally:
+        os.close(fd)
+    
+    # Return relative path for database storage
+    return filepath.as_posix()
+
 
 def save_base64_image(base64_string: str, worker_id: int) -> str:
     """
@@ -37,33 +114,60 @@ def save_base64_image(base64_string: str, worker_id: int) -> str:
     Returns:
         Relative file path to the saved image
     """
+    if len(base64_string) > MAX_SELFIE_BASE64_CHARS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Selfie image is too large"
+        )
+    
     try:
         # Remove data URI prefix if present (e.g., "data:image/jpeg;base64,")
-        if "," in base64_string and base64_string.startswith("data:"):
-            base64_string = base64_string.split(",", 1)[1]
-        
-        # Decode base64 to bytes
-        image_data = base64.b64decode(base64_string)
+        if base64_string.startswith("data:"):
+            _, sep, rest = base64_string.partition(",")
+            if sep:
+                base64_string = rest
         
-        # Generate unique filename
-        filename = f"worker_{worker_id}_{uuid.uuid4().hex[:8]}.jpg"
-        filepath = UPLOAD_DIR / filename
+        # Decode base64 into a writable buffer (pybase64 uses SIMD kernels for large payloads)
+        image_data = pybase64.b64decode_as_bytearray(base64_string, validate=True)
         
-        # Save the file
-        with open(filepath, "wb") as f:
-            f.write(image_data)
-        
-        # Return relative path for database storage
-        return str(filepath).replace("\\", "/")
+        return save_image_bytes(image_data, worker_id)
     
     except Exception as e:
-        print(f"[ERROR] Failed to save image: {str(e)}")
+        logger.error("Failed to save image: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to save image: {str(e)}"
         )
 
 
+def update_onboarding_step(db: Session, current_user: User, step: int, payload: dict, **values):
+    """
+    Apply a simple onboarding step with a single UPDATE instead of load + flush.
+    
+    The step payload is merged into onboarding_data server-side with JSON_SET, and
+    the WHERE clause carries the same guard as get_onboarding_worker. When no row
+    matches, the dependency is re-run to raise the matching 404/400.
+    """
+    step_data = func.json_object(*[part for item in payload.items() for part in item])
+    result = db.execute(
+        update(Worker)
+        .where(
+            Worker.user_id == current_user.id,
+            not_(and_(Worker.onboarding_step == 6, Worker.status == WorkerStatus.PENDING_VERIFICATION))
+        )
+        .values(
+            onboarding_step=step,
+            onboarding_data=func.json_set(
+                Worker.onboarding_data, f"$.step{step}", step_data
+            ),
+            **values
+        )
+    )
+    if result.rowcount == 0:
+        get_onboarding_worker(current_user, db)
+    db.commit()
+
+
 @router.post("/onboard/step1")
 async def onboard_step1(
     data: WorkerOnboardingStep1,
@@ -71,10 +175,12 @@ async def onboard_step1(
     db: Session = Depends(get_db)
 ):
     """Step 1: Category selection and basic info"""
-    print(f"\n[WORKER] Onboarding Step 1 - User ID: {current_user.id}, Category: {data.category}, Name: {data.full_name}")
+    logger.debug("Onboarding Step 1 - User ID: %s, Category: %s, Name: %s", current_user.id, data.category, data.full_name)
+    
+    step_payload = data.model_dump(mode="json")
     
     # Check if worker profile already exists
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     # If worker already submitted for verification, don't allow re-submission
     if worker and worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
@@ -95,15 +201,17 @@ async def onboard_step1(
         if worker.onboarding_step < 6:
             worker.category = data.category
             worker.onboarding_step = 1
-            worker.onboarding_data = worker.onboarding_data or {}
-            worker.onboarding_data.update({"step1": data.dict()})
+            data_map = dict(worker.onboarding_data)
+            data_map["step1"] = step_payload
+            worker.onboarding_data = data_map
+            flag_modified(worker, "onboarding_data")
     else:
         # Create new
         worker = Worker(
             user_id=current_user.id,
             category=data.category,
             onboarding_step=1,
-            onboarding_data={"step1": data.dict()}
+            onboarding_data={"step1": step_payload}
         )
         db.add(worker)
     
@@ -111,11 +219,13 @@ async def onboard_step1(
     current_user.full_name = data.full_name
     current_user.mobile = data.mobile
     
+    # Flush to get the id; reading it after commit would trigger a reload
+    db.flush()
+    worker_id = worker.id
     db.commit()
-    db.refresh(worker)
-    print(f"[WORKER] Step 1 Complete - Worker ID: {worker.id}, Category: {worker.category.value}")
+    logger.debug("Step 1 Complete - Worker ID: %s, Category: %s", worker_id, data.category.value)
     
-    return {"success": True, "worker_id": worker.id, "next_step": 2}
+    return {"success": True, "worker_id": worker_id, "next_step": 2}
 
 
 @router.post("/onboard/step2")
@@ -125,30 +235,15 @@ async def onboard_step2(
     db: Session = Depends(get_db)
 ):
     """Step 2: Address information"""
-    print(f"\n[WORKER] Onboarding Step 2 - User ID: {current_user.id}, City: {data.city}, State: {data.state}")
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
-    
-    if not worker:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Please complete step 1 first"
-        )
-    
-    # Prevent re-submission if already pending verification
-    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Your application is already submitted and pending police verification."
-        )
-    
-    worker.address_current = data.address_current
-    worker.city = data.city
-    worker.state = data.state
-    worker.pincode = data.pincode
-    worker.onboarding_step = 2
-    worker.onboarding_data["step2"] = data.dict()
-    
-    db.commit()
+    logger.debug("Onboarding Step 2 - User ID: %s, City: %s, State: %s", current_user.id, data.city, data.state)
+    
+    update_onboarding_step(
+        db, current_user, 2, data.model_dump(mode="json"),
+        address_current=data.address_current,
+        city=data.city,
+        state=data.state,
+        pincode=data.pincode
+    )
     
     return {"success": True, "next_step": 3}
 
@@ -157,43 +252,79 @@ async def onboard_step2(
 async def onboard_step3(
     data: WorkerOnboardingStep3,
     current_user: User = Depends(get_current_user),
+    worker: Worker = Depends(get_onboarding_worker),
     db: Session = Depends(get_db)
 ):
     """Step 3: Selfie capture"""
-    print(f"\n[WORKER] Onboarding Step 3 - User ID: {current_user.id}")
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    logger.debug("Onboarding Step 3 - User ID: %s", current_user.id)
     
-    if not worker:
+    # Save the base64 image to disk and get the file path
+    try:
+        file_path = await asyncio.get_running_loop().run_in_executor(
+            _SELFIE_WRITER, save_base64_image, data.selfie_url, worker.id
+        )
+        logger.debug("Selfie saved successfully: %s", file_path)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to save selfie: %s", e)
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Please complete previous steps first"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to save selfie image: {str(e)}"
         )
     
-    # Prevent re-submission if already pending verification
-    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
+    return record_selfie(worker, file_path, db)
+
+
+@router.post("/onboard/step3/upload")
+async def onboard_step3_upload(
+    selfie: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    worker: Worker = Depends(get_onboarding_worker),
+    db: Session = Depends(get_db)
+):
+    """Step 3: Selfie capture (multipart upload - raw image bytes, no base64)"""
+    logger.debug("Onboarding Step 3 (upload) - User ID: %s", current_user.id)
+    
+    image_data = await selfie.read(MAX_SELFIE_BYTES + 1)
+    if not image_data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Your application is already submitted and pending police verification."
+            detail="Selfie image is empty"
+        )
+    if len(image_data) > MAX_SELFIE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Selfie image is too large"
         )
     
-    # Save the base64 image to disk and get the file path
     try:
-        file_path = save_base64_image(data.selfie_url, worker.id)
-        print(f"[WORKER] Selfie saved successfully: {file_path}")
-        worker.selfie_url = file_path
+        file_path = await asyncio.get_running_loop().run_in_executor(
+            _SELFIE_WRITER, save_image_bytes, image_data, worker.id
+        )
+        logger.debug("Selfie saved successfully: %s", file_path)
     except Exception as e:
-        print(f"[ERROR] Failed to save selfie: {str(e)}")
+        logger.error("Failed to save selfie: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to save selfie image: {str(e)}"
         )
     
+    return record_selfie(worker, file_path, db)
+
+
+def record_selfie(worker: Worker, file_path: str, db: Session) -> dict:
+    """Store the saved selfie path on the worker and advance to step 4"""
+    worker.selfie_url = file_path
     worker.onboarding_step = 3
-    # Store only a reference in onboarding_data, not the full base64
-    worker.onboarding_data["step3"] = {"selfie_saved": True, "file_path": file_path}
+    # Store only a reference in onboarding_data, not the image itself
+    data_map = dict(worker.onboarding_data)
+    data_map["step3"] = {"selfie_saved": True, "file_path": file_path}
+    worker.onboarding_data = data_map
+    flag_modified(worker, "onboarding_data")
     
     db.commit()
-    print(f"[WORKER] Step 3 Complete - Selfie stored at: {file_path}")
+    logger.debug("Step 3 Complete - Selfie stored at: %s", file_path)
     
     return {"success": True, "next_step": 4, "selfie_path": file_path}
 
@@ -205,26 +336,10 @@ async def onboard_step4(
     db: Session = Depends(get_db)
 ):
     """Step 4: Aadhaar reference"""
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
-    
-    if not worker:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Please complete previous steps first"
-        )
-    
-    # Prevent re-submission if already pending verification
-    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Your application is already submitted and pending police verification."
-        )
-    
-    worker.aadhaar_reference = data.aadhaar_reference
-    worker.onboarding_step = 4
-    worker.onboarding_data["step4"] = data.dict()
-    
-    db.commit()
+    update_onboarding_step(
+        db, current_user, 4, data.model_dump(mode="json"),
+        aadhaar_reference=data.aadhaar_reference
+    )
     
     return {"success": True, "next_step": 5}
 
@@ -236,34 +351,16 @@ async def onboard_step5(
     db: Session = Depends(get_db)
 ):
     """Step 5: AePS specific information (if applicable)"""
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
-    
-    if not worker:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Please complete previous steps first"
-        )
-    
-    # Prevent re-submission if already pending verification
-    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Your application is already submitted and pending police verification."
-        )
-    
-    # Only for AePS agents
-    if worker.category == WorkerCategory.AEPS_AGENT:
-        worker.bank_affiliation = data.bank_affiliation
-        worker.bc_affiliation = data.bc_affiliation
-        worker.aeps_operator_id = data.aeps_operator_id
-        worker.service_region = data.service_region
-        worker.aeps_device_info = data.aeps_device_info
-        worker.transaction_role = data.transaction_role
+    step_payload = data.model_dump(mode="json")
     
-    worker.onboarding_step = 5
-    worker.onboarding_data["step5"] = data.dict()
+    # Only for AePS agents - other categories keep their current column values
+    is_aeps = Worker.category == WorkerCategory.AEPS_AGENT
+    aeps_values = {
+        field: case((is_aeps, value), else_=getattr(Worker, field))
+        for field, value in step_payload.items()
+    }
     
-    db.commit()
+    update_onboarding_step(db, current_user, 5, step_payload, **aeps_values)
     
     return {"success": True, "next_step": 6}
 
@@ -272,29 +369,18 @@ async def onboard_step5(
 async def onboard_step6(
     data: WorkerOnboardingStep6,
     current_user: User = Depends(get_current_user),
+    worker: Worker = Depends(get_onboarding_worker),
     db: Session = Depends(get_db)
 ):
     """Step 6: Consent and finalize"""
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
-    
-    if not worker:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Please complete previous steps first"
-        )
-    
-    # Prevent re-submission if already pending verification
-    if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Your application is already submitted and pending police verification."
-        )
-    
     worker.consent_given = data.consent_given
     worker.consent_timestamp = datetime.utcnow()
     worker.declaration_signed = data.declaration_signed
     worker.onboarding_step = 6
-    worker.onboarding_data["step6"] = data.dict()
+    data_map = dict(worker.onboarding_data)
+    data_map["step6"] = data.model_dump(mode="json")
+    worker.onboarding_data = data_map
+    flag_modified(worker, "onboarding_data")
     
     # Store device fingerprint
     if data.device_fingerprint:
@@ -304,26 +390,26 @@ async def onboard_step6(
     worker.status = WorkerStatus.PENDING_VERIFICATION
     worker.verification_status = VerificationStatus.PENDING
     
-    db.commit()
-    db.refresh(worker)
-    print(f"[WORKER] Onboarding Complete - Internal ID: {worker.id}, Status: {worker.status.value}")
-    print(f"[WORKER] Awaiting police verification - Worker ID and QR code will be generated after approval")
-    
-    # Create audit log
+    # Create audit log in the same transaction as the worker update
     create_audit_log(
         user_id=current_user.id,
         action="worker_onboarding_complete",
         resource_type="worker",
         resource_id=worker.id,
         details={"category": worker.category.value},
-        db=db
+        db=db,
+        commit=False
     )
     
+    logger.debug("Onboarding Complete - Internal ID: %s, Status: %s", worker.id, WorkerStatus.PENDING_VERIFICATION.value)
+    db.commit()
+    logger.debug("Awaiting police verification - Worker ID and QR code will be generated after approval")
+    
     return {
         "success": True,
         "message": "Onboarding complete. Your application has been submitted for police verification.",
-        "status": worker.status.value,
-        "verification_status": worker.verification_status.value
+        "status": WorkerStatus.PENDING_VERIFICATION.value,
+        "verification_status": VerificationStatus.PENDING.value
     }
 
 
@@ -334,10 +420,10 @@ async def onboard_complete(
     db: Session = Depends(get_db)
 ):
     """Complete onboarding - Finalize after step-by-step process"""
-    print(f"\n[WORKER] Onboarding Complete - User ID: {current_user.id}")
+    logger.debug("Onboarding Complete - User ID: %s", current_user.id)
     
     # Get existing worker profile (must exist from previous steps)
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     if not worker:
         raise HTTPException(
@@ -360,21 +446,7 @@ async def onboard_complete(
         )
     
     # Validate that required fields from previous steps exist
-    missing_fields = []
-    if not worker.category:
-        missing_fields.append("category (step 1)")
-    if not worker.address_current:
-        missing_fields.append("address (step 2)")
-    if not worker.city:
-        missing_fields.append("city (step 2)")
-    if not worker.state:
-        missing_fields.append("state (step 2)")
-    if not worker.pincode:
-        missing_fields.append("pincode (step 2)")
-    if not worker.selfie_url:
-        missing_fields.append("selfie (step 3)")
-    if not worker.aadhaar_reference:
-        missing_fields.append("aadhaar (step 4)")
+    missing_fields = [label for attr, label in _REQUIRED_ONBOARDING_FIELDS if not getattr(worker, attr)]
     
     if missing_fields:
         raise HTTPException(
@@ -396,38 +468,38 @@ async def onboard_complete(
     worker.status = WorkerStatus.PENDING_VERIFICATION
     worker.verification_status = VerificationStatus.PENDING
     
-    db.commit()
-    db.refresh(worker)
-    print(f"[WORKER] Onboarding Complete - Internal ID: {worker.id}, Status: {worker.status.value}")
-    print(f"[WORKER] Awaiting police verification - Worker ID and QR code will be generated after approval")
-    
-    # Create audit log
+    # Create audit log in the same transaction as the worker update
     create_audit_log(
         user_id=current_user.id,
         action="worker_onboarding_complete",
         resource_type="worker",
         resource_id=worker.id,
         details={"category": worker.category.value},
-        db=db
+        db=db,
+        commit=False
     )
     
+    logger.debug("Onboarding Complete - Internal ID: %s, Status: %s", worker.id, WorkerStatus.PENDING_VERIFICATION.value)
+    db.commit()
+    logger.debug("Awaiting police verification - Worker ID and QR code will be generated after approval")
+    
     return {
         "success": True,
         "message": "Onboarding complete. Your application has been submitted for police verification.",
-        "status": worker.status.value,
-        "verification_status": worker.verification_status.value
+        "status": WorkerStatus.PENDING_VERIFICATION.value,
+        "verification_status": VerificationStatus.PENDING.value
     }
 
 
 def get_worker_profile_data(current_user: User, db: Session):
     """Helper function to get worker profile data"""
-    print(f"\n[WORKER] Profile request - User ID: {current_user.id}, Role: {current_user.role.value}")
+    logger.debug("Profile request - User ID: %s, Role: %s", current_user.id, current_user.role.value)
     
     # Get worker profile
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     if not worker:
-        print(f"[WORKER] No worker profile found for user {current_user.id}")
+        logger.debug("No worker profile found for user %s", current_user.id)
         # Return empty profile if not onboarded yet
         return {
             "has_profile": False,
@@ -438,7 +510,7 @@ def get_worker_profile_data(current_user: User, db: Session):
             "role": current_user.role.value
         }
     
-    print(f"[WORKER] Profile found - Internal ID: {worker.id}, Official Worker ID: {worker.worker_id}, Category: {worker.category}, Step: {worker.onboarding_step}")
+    logger.debug("Profile found - Internal ID: %s, Official Worker ID: %s, Category: %s, Step: %s", worker.id, worker.worker_id, worker.category, worker.onboarding_step)
     
     # Determine what to show as Worker ID - ONLY show if police verified
     if worker.verification_status == VerificationStatus.VERIFIED and worker.worker_id:
@@ -461,9 +533,9 @@ def get_worker_profile_data(current_user: User, db: Session):
         # Worker details - NEVER show internal database ID
         "worker_id": display_worker_id,  # Official Worker ID or status message
         "worker_id_status": worker_id_status,  # For frontend to handle display
-        "category": worker.category.value if worker.category else None,
-        "status": worker.status.value if worker.status else None,
-        "verification_status": worker.verification_status.value if worker.verification_status else None,
+        "category": worker.category,
+        "status": worker.status,
+        "verification_status": worker.verification_status,
         "onboarding_step": worker.onboarding_step,
         
         # User details
@@ -495,8 +567,8 @@ def get_worker_profile_data(current_user: User, db: Session):
         "current_company_id": worker.current_company_id,
         
         # Timestamps
-        "created_at": worker.created_at.isoformat() if worker.created_at else None,
-        "updated_at": worker.updated_at.isoformat() if worker.updated_at else None
+        "created_at": worker.created_at,
+        "updated_at": worker.updated_at
     }
 
 
@@ -526,7 +598,7 @@ async def get_verification_status(
     """Get comprehensive verification status (onboarding, police, face verification)"""
     from app.models import PoliceVerification
     
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     if not worker:
         return {
@@ -556,59 +628,34 @@ async def get_verification_status(
     
     # Determine onboarding status
     if worker.onboarding_step == 6:
-        onboarding_status = "completed"
-        onboarding_label = "COMPLETED"
-        onboarding_desc = "Registration process completed"
+        onboarding_status, onboarding_label, onboarding_desc = _ONBOARDING_COMPLETED
     elif worker.onboarding_step > 0:
-        onboarding_status = "in_progress"
-        onboarding_label = "IN PROGRESS"
+        onboarding_status, onboarding_label = _ONBOARDING_IN_PROGRESS
         onboarding_desc = f"Step {worker.onboarding_step} of 6 completed"
     else:
-        onboarding_status = "not_started"
-        onboarding_label = "NOT STARTED"
-        onboarding_desc = "Start your registration"
+        onboarding_status, onboarding_label, onboarding_desc = _ONBOARDING_NOT_STARTED
     
     # Determine police verification status
-    if worker.verification_status == VerificationStatus.VERIFIED:
-        police_status = "verified"
-        police_label = "VERIFIED"
-        police_desc = "Background check completed"
-    elif worker.verification_status == VerificationStatus.REJECTED:
-        police_status = "rejected"
-        police_label = "REJECTED"
-        police_desc = "Verification rejected"
-    elif worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION:
-        police_status = "pending"
-        police_label = "PENDING"
-        police_desc = "Background check by law enforcement"
-    else:
-        police_status = "not_started"
-        police_label = "NOT STARTED"
-        police_desc = "Awaiting onboarding completion"
+    police_status, police_label, police_desc = _POLICE_STATUS.get(worker.verification_status) or (
+        _POLICE_PENDING
+        if worker.onboarding_step == 6 and worker.status == WorkerStatus.PENDING_VERIFICATION
+        else _POLICE_NOT_STARTED
+    )
     
     # Determine face verification status
     if latest_verification and latest_verification.face_match_performed:
         if latest_verification.liveness_check and latest_verification.face_match_score >= 0.8:
-            face_status = "verified"
-            face_label = "VERIFIED"
+            face_status, face_label = _FACE_VERIFIED[:2]
             face_desc = f"Biometric match: {int(latest_verification.face_match_score * 100)}%"
         else:
-            face_status = "failed"
-            face_label = "FAILED"
-            face_desc = "Biometric verification failed"
+            face_status, face_label, face_desc = _FACE_FAILED
     elif worker.verification_status == VerificationStatus.VERIFIED:
         # Verified without explicit face check
-        face_status = "verified"
-        face_label = "VERIFIED"
-        face_desc = "Biometric facial recognition"
+        face_status, face_label, face_desc = _FACE_VERIFIED
     elif worker.onboarding_step == 6:
-        face_status = "pending"
-        face_label = "PENDING"
-        face_desc = "Biometric facial recognition"
+        face_status, face_label, face_desc = _FACE_PENDING
     else:
-        face_status = "not_started"
-        face_label = "NOT STARTED"
-        face_desc = "Awaiting submission"
+        face_status, face_label, face_desc = _FACE_NOT_STARTED
     
     return {
         "onboarding": {
@@ -622,7 +669,7 @@ async def get_verification_status(
             "status": police_status,
             "label": police_label,
             "description": police_desc,
-            "verified_at": latest_verification.verification_date.isoformat() if latest_verification and latest_verification.verification_date else None
+            "verified_at": latest_verification.verification_date if latest_verification else None
         },
         "face_verification": {
             "status": face_status,
@@ -630,12 +677,12 @@ async def get_verification_status(
             "description": face_desc,
             "match_score": latest_verification.face_match_score if latest_verification else None,
             "liveness_check": latest_verification.liveness_check if latest_verification else None,
-            "verified_at": latest_verification.created_at.isoformat() if latest_verification and latest_verification.face_match_performed else None
+            "verified_at": latest_verification.created_at if latest_verification and latest_verification.face_match_performed else None
         },
         "overall": {
             "worker_id": worker.worker_id,
-            "status": worker.status.value if worker.status else None,
-            "verification_status": worker.verification_status.value if worker.verification_status else None,
+            "status": worker.status,
+            "verification_status": worker.verification_status,
             "is_active": worker.status == WorkerStatus.ACTIVE if worker.status else False
         }
     }
@@ -647,7 +694,7 @@ async def get_onboarding_status(
     db: Session = Depends(get_db)
 ):
     """Get onboarding progress"""
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     if not worker:
         return {
@@ -706,8 +753,8 @@ async def get_onboarding_status(
         "completed": False,
         "can_proceed": True,
         "worker_id": worker.worker_id,
-        "status": worker.status.value if worker.status else None,
-        "verification_status": worker.verification_status.value if worker.verification_status else None,
+        "status": worker.status,
+        "verification_status": worker.verification_status,
         "message": f"Continue from step {worker.onboarding_step + 1}",
         "data": worker.onboarding_data
     }
@@ -738,10 +785,10 @@ async def get_worker_activities(
     db: Session = Depends(get_db)
 ):
     """Get worker's activity history (last 2 weeks)"""
-    print(f"\n[WORKER] Activities requested - User ID: {current_user.id}")
+    logger.debug("Activities requested - User ID: %s", current_user.id)
     
     # Get worker profile
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = get_worker_by_user_id(db, current_user.id)
     
     if not worker:
         return {
@@ -757,46 +804,13 @@ async def get_worker_activities(
         WorkerActivity.activity_date >= two_weeks_ago
     ).order_by(WorkerActivity.activity_date.desc()).all()
     
-    print(f"[WORKER] Found {len(activities)} activities for worker ID: {worker.id}")
-    
-    # Format activities based on type
-    result = []
-    for activity in activities:
-        activity_data = {
-            "id": activity.id,
-            "activity_type": activity.activity_type,
-            "activity_date": activity.activity_date.isoformat(),
-            "location": activity.location,
-            "city": activity.city,
-            "state": activity.state,
-            "pincode": activity.pincode,
-            "status": activity.status,
-            "notes": activity.notes
-        }
-        
-        # Add type-specific fields
-        if activity.activity_type == "delivery":
-            activity_data.update({
-                "package_id": activity.package_id,
-                "delivery_partner": activity.delivery_partner,
-                "package_type": activity.package_type,
-                "recipient_name": activity.recipient_name,
-                "recipient_contact": activity.recipient_contact
-            })
-        elif activity.activity_type == "transaction":
-            activity_data.update({
-                "customer_name": activity.customer_name,
-                "customer_contact": activity.customer_contact,
-                "transaction_type": activity.transaction_type,
-                "transaction_amount": activity.transaction_amount,
-                "bank_name": activity.bank_name
-            })
-        
-        result.append(activity_data)
+    logger.debug("Found %s activities for worker ID: %s", len(activities), worker.id)
+    
+    result = serialize_activities(activities)
     
     return {
         "activities": result,
         "total": len(result),
-        "worker_category": worker.category.value if worker.category else None
+        "worker_category": worker.category
     }
 
@@ -1,14 +1,15 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
-from enum import Enum
+from app.models import StrEnum
+from operator import attrgetter
 
 
 # Enums
-class UserRole(str, Enum):
+class UserRole(StrEnum):
     WORKER = "worker"
     DELIVERY_WORKER = "delivery_worker"
     AEPS_AGENT = "aeps_agent"
@@ -17,19 +18,19 @@ class UserRole(str, Enum):
     ADMIN = "admin"
 
 
-class WorkerCategory(str, Enum):
+class WorkerCategory(StrEnum):
     DELIVERY_WORKER = "delivery_worker"
     AEPS_AGENT = "aeps_agent"
 
 
-class VerificationStatus(str, Enum):
+class VerificationStatus(StrEnum):
     PENDING = "pending"
     VERIFIED = "verified"
     REJECTED = "rejected"
     EXPIRED = "expired"
 
 
-class WorkerStatus(str, Enum):
+class WorkerStatus(StrEnum):
     ACTIVE = "active"
     INACTIVE = "inactive"
     SUSPENDED = "suspended"
@@ -37,7 +38,7 @@ class WorkerStatus(str, Enum):
     PENDING_VERIFICATION = "pending_verification"
 
 
-class ComplaintCategory(str, Enum):
+class ComplaintCategory(StrEnum):
     FRAUD = "fraud"
     MISBEHAVIOR = "misbehavior"
     MISUSE = "misuse"
@@ -49,29 +50,37 @@ class ComplaintCategory(str, Enum):
 class SignupRequest(BaseModel):
     full_name: str
     role: UserRole
-    email: Optional[EmailStr] = None
-    mobile: Optional[str] = None
-    password: Optional[str] = None
-    otp: Optional[str] = None
+    email: EmailStr | None = None
+    mobile: str | None = None
+    password: str | None = None
+    otp: str | None = None
 
 
 class LoginRequest(BaseModel):
     login_method: str  # email_password, mobile_otp, mobile_password
-    email: Optional[EmailStr] = None
-    mobile: Optional[str] = None
-    password: Optional[str] = None
-    otp: Optional[str] = None
+    email: EmailStr | None = None
+    mobile: str | None = None
+    password: str | None = None
+    otp: str | None = None
 
 
-class OTPRequest(BaseModel):
-    email: Optional[EmailStr] = None
-    mobile: Optional[str] = None
+class OTPContact(BaseModel):
+    """Email and/or mobile an OTP is sent to - at least one is required"""
+    email: EmailStr | None = None
+    mobile: str | None = None
+
+    @model_validator(mode="after")
+    def check_contact(self):
+        if not self.email and not self.mobile:
+            raise ValueError("Email or mobile number required")
+        return self
+
+
+class OTPRequest(OTPContact):
     purpose: str  # signup, login, email_verification
 
 
-class OTPVerify(BaseModel):
-    email: Optional[EmailStr] = None
-    mobile: Optional[str] = None
+class OTPVerify(OTPContact):
     otp: str
     purpose: str
 
@@ -106,8 +115,7 @@ class UserResponse(BaseModel):
     mobile_verified: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Worker Schemas
@@ -153,25 +161,12 @@ class WorkerOnboardingStep6(BaseModel):
     device_fingerprint: Optional[str] = None
 
 
-class WorkerOnboardComplete(BaseModel):
-    """Complete onboarding data"""
+class WorkerOnboardComplete(
+    WorkerOnboardingStep2, WorkerOnboardingStep3, WorkerOnboardingStep4,
+    WorkerOnboardingStep5, WorkerOnboardingStep6
+):
+    """Complete onboarding data (steps 2-6 plus category)"""
     category: WorkerCategory
-    address_current: str
-    city: str
-    state: str
-    pincode: str
-    selfie_url: str
-    aadhaar_reference: str
-    consent_given: bool
-    declaration_signed: bool
-    device_fingerprint: Optional[str] = None
-    # AePS specific
-    bank_affiliation: Optional[str] = None
-    bc_affiliation: Optional[str] = None
-    aeps_operator_id: Optional[str] = None
-    service_region: Optional[str] = None
-    aeps_device_info: Optional[str] = None
-    transaction_role: Optional[str] = None
 
 
 class WorkerResponse(BaseModel):
@@ -186,8 +181,7 @@ class WorkerResponse(BaseModel):
     qr_code_url: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WorkerDetailResponse(WorkerResponse):
@@ -222,8 +216,7 @@ class CompanyResponse(BaseModel):
     api_key: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Police Verification Schemas
@@ -247,8 +240,7 @@ class PoliceVerificationResponse(BaseModel):
     face_match_score: Optional[float] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FaceVerificationRequest(BaseModel):
@@ -263,6 +255,16 @@ class FaceVerificationResponse(BaseModel):
     confidence: float
 
 
+class FaceVerificationBatchRequest(BaseModel):
+    items: List[FaceVerificationRequest] = Field(..., min_length=1, max_length=100)
+
+
+class FaceVerificationBatchItem(BaseModel):
+    worker_id: int
+    result: Optional[FaceVerificationResponse] = None
+    error: Optional[str] = None
+
+
 # Complaint Schemas
 class ComplaintCreate(BaseModel):
     worker_id: int
@@ -281,8 +283,7 @@ class ComplaintResponse(BaseModel):
     status: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Incident Schemas
@@ -331,3 +332,40 @@ class WorkerUpdateStatus(BaseModel):
     status: WorkerStatus
     reason: Optional[str] = None
 
+
+# Activity serialization (shared by the worker and police activity endpoints)
+_ACTIVITY_FIELDS = (
+    "id", "activity_type", "activity_date", "location", "city", "state",
+    "pincode", "status", "notes"
+)
+_ACTIVITY_TYPE_FIELDS = {
+    "delivery": (
+        "package_id", "delivery_partner", "package_type",
+        "recipient_name", "recipient_contact"
+    ),
+    "transaction": (
+        "customer_name", "customer_contact", "transaction_type",
+        "transaction_amount", "bank_name"
+    ),
+}
+# Getters are built once at import instead of per activity
+_ACTIVITY_GETTER = attrgetter(*_ACTIVITY_FIELDS)
+_ACTIVITY_TYPE_GETTERS = {
+    activity_type: (fields, attrgetter(*fields))
+    for activity_type, fields in _ACTIVITY_TYPE_FIELDS.items()
+}
+
+
+def serialize_activities(activities) -> List[dict]:
+    """Convert WorkerActivity rows into response dicts with their type-specific fields"""
+    result = []
+    for activity in activities:
+        data = dict(zip(_ACTIVITY_FIELDS, _ACTIVITY_GETTER(activity)))
+        if data["activity_date"] is not None:
+            data["activity_date"] = data["activity_date"].isoformat()
+        extra = _ACTIVITY_TYPE_GETTERS.get(activity.activity_type)
+        if extra:
+            fields, getter = extra
+            data.update(zip(fields, getter(activity)))
+        result.append(data)
+    return result
@@ -0,0 +1,31 @@
+"""
+Shared boto3 session for AWS service clients
+"""
+import os
+from functools import lru_cache
+import boto3
+from botocore.config import Config as BotoConfig
+
+# Shared Rekognition client settings: a pool large enough for concurrent
+# verifications, warm keep-alive connections and adaptive retry backoff
+REKOGNITION_CLIENT_CONFIG = BotoConfig(
+    max_pool_connections=64,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10
+)
+
+
+@lru_cache(maxsize=1)
+def get_session() -> boto3.session.Session:
+    """Single session so credentials and endpoint data are loaded once per process"""
+    return boto3.session.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+    )
+
+
+def get_client(service_name: str, **kwargs):
+    """Create a client for an AWS service from the shared session"""
+    return get_session().client(service_name, **kwargs)
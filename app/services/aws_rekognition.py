@@ -2,18 +2,32 @@
 AWS Rekognition Service for Face Recognition and Verification
 Production-ready implementation with error handling and logging
 """
-import boto3
-from botocore.exceptions import ClientError, BotoCoreError
+from botocore.exceptions import ClientError
 import os
-from typing import Optional, Dict, List, Tuple
-import base64
-from pathlib import Path
+import pybase64
+import hashlib
 import logging
+import threading
+from operator import itemgetter
+from functools import lru_cache
+from cachetools import TTLCache
+from app.services.aws import REKOGNITION_CLIENT_CONFIG, get_client
+from app.services.images import prepare_image_bytes
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of face-search results keyed by image content, so retries and
+# UI re-submits of the same scan skip the AWS round trip
+SEARCH_CACHE_TTL_SECONDS = 60
+_search_cache = TTLCache(maxsize=1024, ttl=SEARCH_CACHE_TTL_SECONDS)
+_search_cache_lock = threading.Lock()
+
+
+def _clear_search_cache():
+    """Drop cached search results (the collection changed)"""
+    with _search_cache_lock:
+        _search_cache.clear()
+
 
 class AWSRekognitionService:
     """
@@ -25,12 +39,10 @@ class AWSRekognitionService:
     3. Collection management
     """
     
+    __slots__ = ('aws_access_key', 'aws_secret_key', 'aws_region', 'collection_id', 'client')
+    
     def __init__(self):
         """Initialize AWS Rekognition client and collection"""
-        print("\n" + "="*70)
-        print("[REKOGNITION-INIT] Initializing AWS Rekognition Service...")
-        print("="*70)
-        
         try:
             # Get AWS credentials from environment
             self.aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
@@ -38,83 +50,63 @@ class AWSRekognitionService:
             self.aws_region = os.getenv("AWS_REGION", "ap-south-1")  # Mumbai region
             self.collection_id = os.getenv("REKOGNITION_COLLECTION_ID", "jansuraksha-workers")
             
-            print(f"[REKOGNITION-INIT] AWS Region: {self.aws_region}")
-            print(f"[REKOGNITION-INIT] Collection ID: {self.collection_id}")
-            print(f"[REKOGNITION-INIT] Access Key ID: {self.aws_access_key[:20] + '...' if self.aws_access_key else 'NOT SET'}")
+            logger.debug("Rekognition region=%s collection=%s", self.aws_region, self.collection_id)
             
             # Validate credentials
             if not self.aws_access_key or not self.aws_secret_key:
-                print("[REKOGNITION-INIT] WARNING: AWS credentials not found in environment variables")
-                print("[REKOGNITION-INIT] Face recognition feature will NOT work")
-                print("[REKOGNITION-INIT] Please set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY in .env file")
-                logger.warning("AWS credentials not found. Face recognition will not work.")
+                logger.warning(
+                    "AWS credentials not found. Face recognition will not work. "
+                    "Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY in .env"
+                )
                 self.client = None
                 return
             
             # Initialize Rekognition client
-            print("[REKOGNITION-INIT] Creating AWS Rekognition client...")
-            self.client = boto3.client(
+            self.client = get_client(
                 'rekognition',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.aws_region
+                region_name=self.aws_region,
+                config=REKOGNITION_CLIENT_CONFIG
             )
-            print("[REKOGNITION-INIT] AWS Rekognition client created successfully")
             
             # Ensure collection exists
-            print("[REKOGNITION-INIT] Checking/creating face collection...")
             self._ensure_collection_exists()
             
-            print("[REKOGNITION-INIT] SUCCESS: AWS Rekognition initialized successfully")
-            print("="*70 + "\n")
-            logger.info(f"✓ AWS Rekognition initialized successfully (Region: {self.aws_region})")
+            logger.info("AWS Rekognition initialized successfully (Region: %s)", self.aws_region)
             
         except Exception as e:
-            print(f"[REKOGNITION-INIT] ERROR: Failed to initialize AWS Rekognition")
-            print(f"[REKOGNITION-INIT] Error: {str(e)}")
-            print("="*70 + "\n")
-            logger.error(f"Failed to initialize AWS Rekognition: {str(e)}")
+            logger.error("Failed to initialize AWS Rekognition: %s", e)
             self.client = None
     
     def _ensure_collection_exists(self):
         """Ensure the face collection exists, create if it doesn't"""
         if not self.client:
-            print("[REKOGNITION-INIT] WARNING: Client not initialized, skipping collection check")
+            logger.warning("Rekognition client not initialized, skipping collection check")
             return
         
         try:
             # Try to describe the collection
-            print(f"[REKOGNITION-INIT] Checking if collection '{self.collection_id}' exists...")
             response = self.client.describe_collection(CollectionId=self.collection_id)
-            face_count = response.get('FaceCount', 0)
-            print(f"[REKOGNITION-INIT] Collection '{self.collection_id}' exists")
-            print(f"[REKOGNITION-INIT] Current indexed faces: {face_count}")
-            logger.info(f"✓ Collection '{self.collection_id}' exists")
+            logger.info("Collection '%s' exists (%s indexed faces)", self.collection_id, response.get('FaceCount', 0))
             
         except self.client.exceptions.ResourceNotFoundException:
             # Collection doesn't exist, create it
-            print(f"[REKOGNITION-INIT] Collection '{self.collection_id}' not found")
-            print(f"[REKOGNITION-INIT] Creating new collection...")
             try:
                 self.client.create_collection(CollectionId=self.collection_id)
-                print(f"[REKOGNITION-INIT] SUCCESS: Created new collection '{self.collection_id}'")
-                logger.info(f"✓ Created new collection '{self.collection_id}'")
+                logger.info("Created new collection '%s'", self.collection_id)
             except ClientError as e:
-                print(f"[REKOGNITION-INIT] ERROR: Failed to create collection: {str(e)}")
-                logger.error(f"Failed to create collection: {str(e)}")
+                logger.error("Failed to create collection: %s", e)
                 raise
         
         except ClientError as e:
-            print(f"[REKOGNITION-INIT] ERROR: Failed to check collection: {str(e)}")
-            logger.error(f"Error checking collection: {str(e)}")
+            logger.error("Error checking collection: %s", e)
             raise
     
     def index_face(
         self, 
         image_path: str, 
         worker_id: str,
-        external_image_id: Optional[str] = None
-    ) -> Tuple[bool, Optional[Dict], Optional[str]]:
+        external_image_id: str | None = None
+    ) -> tuple[bool, dict | None, str | None]:
         """
         Index a face into the Rekognition collection.
         
@@ -126,59 +118,42 @@ class AWSRekognitionService:
         Returns:
             Tuple of (success, face_data, error_message)
         """
-        print(f"\n[REKOGNITION-INDEX] Starting face indexing process...")
-        print(f"[REKOGNITION-INDEX] Worker ID: {worker_id}")
-        print(f"[REKOGNITION-INDEX] Image Path: {image_path}")
-        print(f"[REKOGNITION-INDEX] Collection: {self.collection_id}")
+        logger.debug("Indexing face for worker %s from %s", worker_id, image_path)
         
         if not self.client:
-            print("[REKOGNITION-INDEX] ERROR: AWS Rekognition client not configured")
             return False, None, "AWS Rekognition not configured"
         
         try:
             # Read image file
-            print(f"[REKOGNITION-INDEX] Reading image file...")
             with open(image_path, 'rb') as image_file:
                 image_bytes = image_file.read()
             
-            image_size_kb = len(image_bytes) / 1024
-            print(f"[REKOGNITION-INDEX] Image size: {image_size_kb:.2f} KB")
-            
             # Use worker_id as external_image_id if not provided
             if not external_image_id:
                 external_image_id = worker_id
             
-            print(f"[REKOGNITION-INDEX] External Image ID: {external_image_id}")
-            
             # Index the face
-            print(f"[REKOGNITION-INDEX] Calling AWS Rekognition IndexFaces API...")
             response = self.client.index_faces(
                 CollectionId=self.collection_id,
-                Image={'Bytes': image_bytes},
+                Image={'Bytes': prepare_image_bytes(image_bytes)},
                 ExternalImageId=external_image_id,
                 MaxFaces=1,  # Only index one face (the main subject)
                 QualityFilter="AUTO",  # Filter out low-quality faces
-                DetectionAttributes=['ALL']
+                DetectionAttributes=['DEFAULT']  # Quality is part of DEFAULT
             )
             
-            print(f"[REKOGNITION-INDEX] API call successful")
-            
             # Check if any faces were indexed
             if not response['FaceRecords']:
-                print("[REKOGNITION-INDEX] WARNING: No face detected in the image")
+                logger.debug("No face detected in image for worker %s", worker_id)
                 return False, None, "No face detected in image"
             
-            print(f"[REKOGNITION-INDEX] Faces detected: {len(response['FaceRecords'])}")
-            
             face_record = response['FaceRecords'][0]
             face_id = face_record['Face']['FaceId']
             confidence = face_record['Face']['Confidence']
-            brightness = face_record['FaceDetail']['Quality']['Brightness']
-            sharpness = face_record['FaceDetail']['Quality']['Sharpness']
-            
-            print(f"[REKOGNITION-INDEX] Face ID: {face_id}")
-            print(f"[REKOGNITION-INDEX] Confidence: {confidence:.2f}%")
-            print(f"[REKOGNITION-INDEX] Image Quality - Brightness: {brightness:.2f}, Sharpness: {sharpness:.2f}")
+            quality = face_record.get('FaceDetail', {}).get('Quality', {})
+            brightness = quality.get('Brightness')
+            sharpness = quality.get('Sharpness')
+
             
             # Extract face details
             face_data = {
@@ -193,8 +168,8 @@ class AWSRekognitionService:
                 'bounding_box': face_record['Face']['BoundingBox']
             }
             
-            print(f"[REKOGNITION-INDEX] SUCCESS: Face indexed successfully for worker {worker_id}")
-            logger.info(f"✓ Face indexed successfully for worker {worker_id} (FaceID: {face_id})")
+            _clear_search_cache()
+            logger.info("Face indexed for worker %s (FaceID: %s, confidence %.2f%%)", worker_id, face_id, confidence)
             
             return True, face_data, None
             
@@ -202,27 +177,22 @@ class AWSRekognitionService:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"[REKOGNITION-INDEX] ERROR: AWS ClientError occurred")
-            print(f"[REKOGNITION-INDEX] Error Code: {error_code}")
-            print(f"[REKOGNITION-INDEX] Error Message: {error_message}")
+            logger.debug("IndexFaces failed: %s - %s", error_code, error_message)
             
             if error_code == 'InvalidParameterException':
-                print("[REKOGNITION-INDEX] ERROR: Invalid image format or no face detected")
                 return False, None, "Invalid image format or no face detected"
             elif error_code == 'InvalidImageFormatException':
-                print("[REKOGNITION-INDEX] ERROR: Invalid image format")
                 return False, None, "Invalid image format. Please use JPG or PNG"
             else:
-                logger.error(f"AWS Rekognition error: {error_code} - {error_message}")
+                logger.error("AWS Rekognition error: %s - %s", error_code, error_message)
                 return False, None, f"Face indexing failed: {error_message}"
         
         except FileNotFoundError:
-            print(f"[REKOGNITION-INDEX] ERROR: Image file not found at path: {image_path}")
+            logger.warning("Image file not found for face indexing: %s", image_path)
             return False, None, f"Image file not found: {image_path}"
         
         except Exception as e:
-            print(f"[REKOGNITION-INDEX] ERROR: Unexpected error - {str(e)}")
-            logger.error(f"Unexpected error during face indexing: {str(e)}")
+            logger.error("Unexpected error during face indexing: %s", e)
             return False, None, f"Face indexing failed: {str(e)}"
     
     def search_face_by_image(
@@ -230,7 +200,7 @@ class AWSRekognitionService:
         image_path: str,
         threshold: float = 80.0,
         max_faces: int = 5
-    ) -> Tuple[bool, List[Dict], Optional[str]]:
+    ) -> tuple[bool, list[dict], str | None]:
         """
         Search for matching faces in the collection using an image.
         
@@ -253,7 +223,7 @@ class AWSRekognitionService:
             # Search for matching faces
             response = self.client.search_faces_by_image(
                 CollectionId=self.collection_id,
-                Image={'Bytes': image_bytes},
+                Image={'Bytes': prepare_image_bytes(image_bytes)},
                 MaxFaces=max_faces,
                 FaceMatchThreshold=threshold
             )
@@ -263,20 +233,21 @@ class AWSRekognitionService:
                 return True, [], None  # No matches, but no error
             
             # Process matches
-            matches = []
-            for match in response['FaceMatches']:
-                face = match['Face']
-                matches.append({
-                    'face_id': face['FaceId'],
-                    'worker_id': face.get('ExternalImageId', 'Unknown'),
-                    'similarity': match['Similarity'],
-                    'confidence': face['Confidence']
-                })
+            matches = [
+                {
+                    'face_id': m['Face']['FaceId'],
+                    'worker_id': m['Face'].get('ExternalImageId', 'Unknown'),
+                    'similarity': m['Similarity'],
+                    'confidence': m['Face']['Confidence']
+                }
+                for m in response['FaceMatches']
+            ]
             
             # Sort by similarity (highest first)
-            matches.sort(key=lambda x: x['similarity'], reverse=True)
+            if len(matches) > 1:
+                matches.sort(key=itemgetter('similarity'), reverse=True)
             
-            logger.info(f"✓ Face search completed. Found {len(matches)} matches")
+            logger.info("Face search completed. Found %d matches", len(matches))
             
             return True, matches, None
             
@@ -289,14 +260,14 @@ class AWSRekognitionService:
             elif error_code == 'InvalidImageFormatException':
                 return False, [], "Invalid image format. Please use JPG or PNG"
             else:
-                logger.error(f"AWS Rekognition error: {error_code} - {error_message}")
+                logger.error("AWS Rekognition error: %s - %s", error_code, error_message)
                 return False, [], f"Face search failed: {error_message}"
         
         except FileNotFoundError:
             return False, [], f"Image file not found: {image_path}"
         
         except Exception as e:
-            logger.error(f"Unexpected error during face search: {str(e)}")
+            logger.error("Unexpected error during face search: %s", e)
             return False, [], f"Face search failed: {str(e)}"
     
     def search_face_by_base64(
@@ -304,7 +275,7 @@ class AWSRekognitionService:
         base64_image: str,
         threshold: float = 80.0,
         max_faces: int = 5
-    ) -> Tuple[bool, List[Dict], Optional[str]]:
+    ) -> tuple[bool, list[dict], str | None]:
         """
         Search for matching faces using a base64-encoded image.
         
@@ -316,72 +287,68 @@ class AWSRekognitionService:
         Returns:
             Tuple of (success, matches, error_message)
         """
-        print(f"\n[REKOGNITION-SEARCH] Starting face search process...")
-        print(f"[REKOGNITION-SEARCH] Collection: {self.collection_id}")
-        print(f"[REKOGNITION-SEARCH] Threshold: {threshold}%")
-        print(f"[REKOGNITION-SEARCH] Max Faces: {max_faces}")
+        logger.debug("Face search threshold=%s max_faces=%s", threshold, max_faces)
         
         if not self.client:
-            print("[REKOGNITION-SEARCH] ERROR: AWS Rekognition client not configured")
             return False, [], "AWS Rekognition not configured"
         
         try:
             # Remove data URL prefix if present
-            print("[REKOGNITION-SEARCH] Processing base64 image...")
-            if ',' in base64_image:
-                base64_image = base64_image.split(',')[1]
-                print("[REKOGNITION-SEARCH] Removed data URL prefix")
+            _, sep, rest = base64_image.partition(',')
+            payload = rest if sep else base64_image
+            if not payload.strip():
+                return False, [], "Search image is empty"
             
             # Decode base64 image
-            image_bytes = base64.b64decode(base64_image)
-            image_size_kb = len(image_bytes) / 1024
-            print(f"[REKOGNITION-SEARCH] Decoded image size: {image_size_kb:.2f} KB")
+            image_bytes = pybase64.b64decode(payload, validate=False)
+            
+            cache_key = (hashlib.blake2b(image_bytes, digest_size=16).digest(), threshold, max_faces)
+            with _search_cache_lock:
+                cached = _search_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Face search served from cache (%d matches)", len(cached))
+                return True, list(cached), None
             
             # Search for matching faces
-            print(f"[REKOGNITION-SEARCH] Calling AWS Rekognition SearchFacesByImage API...")
             response = self.client.search_faces_by_image(
                 CollectionId=self.collection_id,
-                Image={'Bytes': image_bytes},
+                Image={'Bytes': prepare_image_bytes(image_bytes)},
                 MaxFaces=max_faces,
                 FaceMatchThreshold=threshold
             )
             
-            print(f"[REKOGNITION-SEARCH] API call successful")
-            
             # Check if any matches were found
             if not response['FaceMatches']:
-                print("[REKOGNITION-SEARCH] No matching faces found in the collection")
+                logger.info("Face search completed. No matching faces found")
+                with _search_cache_lock:
+                    _search_cache[cache_key] = []
                 return True, [], None  # No matches, but no error
             
-            print(f"[REKOGNITION-SEARCH] Found {len(response['FaceMatches'])} potential matches")
-            
             # Process matches
-            matches = []
-            for idx, match in enumerate(response['FaceMatches'], 1):
-                face = match['Face']
-                worker_id = face.get('ExternalImageId', 'Unknown')
-                similarity = match['Similarity']
-                confidence = face['Confidence']
-                
-                print(f"[REKOGNITION-SEARCH] Match #{idx}:")
-                print(f"  - Worker ID: {worker_id}")
-                print(f"  - Similarity: {similarity:.2f}%")
-                print(f"  - Confidence: {confidence:.2f}%")
-                print(f"  - Face ID: {face['FaceId']}")
-                
-                matches.append({
-                    'face_id': face['FaceId'],
-                    'worker_id': worker_id,
-                    'similarity': similarity,
-                    'confidence': confidence
-                })
+            matches = [
+                {
+                    'face_id': m['Face']['FaceId'],
+                    'worker_id': m['Face'].get('ExternalImageId', 'Unknown'),
+                    'similarity': m['Similarity'],
+                    'confidence': m['Face']['Confidence']
+                }
+                for m in response['FaceMatches']
+            ]
             
             # Sort by similarity (highest first)
-            matches.sort(key=lambda x: x['similarity'], reverse=True)
+            if len(matches) > 1:
+                matches.sort(key=itemgetter('similarity'), reverse=True)
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                for idx, match in enumerate(matches, 1):
+                    logger.debug(
+                        "Match #%d: worker=%s similarity=%.2f%% confidence=%.2f%% face_id=%s",
+                        idx, match['worker_id'], match['similarity'], match['confidence'], match['face_id']
+                    )
+            logger.info("Face search completed. Found %d matches", len(matches))
             
-            print(f"[REKOGNITION-SEARCH] SUCCESS: Face search completed with {len(matches)} matches")
-            print(f"[REKOGNITION-SEARCH] Top match: {matches[0]['worker_id']} ({matches[0]['similarity']:.2f}% similarity)")
-            logger.info(f"✓ Face search completed. Found {len(matches)} matches")
+            with _search_cache_lock:
+                _search_cache[cache_key] = list(matches)
             
             return True, matches, None
             
@@ -389,26 +356,21 @@ class AWSRekognitionService:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"[REKOGNITION-SEARCH] ERROR: AWS ClientError occurred")
-            print(f"[REKOGNITION-SEARCH] Error Code: {error_code}")
-            print(f"[REKOGNITION-SEARCH] Error Message: {error_message}")
+            logger.debug("SearchFacesByImage failed: %s - %s", error_code, error_message)
             
             if error_code == 'InvalidParameterException':
-                print("[REKOGNITION-SEARCH] ERROR: No face detected in the search image")
                 return False, [], "No face detected in the search image"
             elif error_code == 'InvalidImageFormatException':
-                print("[REKOGNITION-SEARCH] ERROR: Invalid image format")
                 return False, [], "Invalid image format. Please use JPG or PNG"
             else:
-                logger.error(f"AWS Rekognition error: {error_code} - {error_message}")
+                logger.error("AWS Rekognition error: %s - %s", error_code, error_message)
                 return False, [], f"Face search failed: {error_message}"
         
         except Exception as e:
-            print(f"[REKOGNITION-SEARCH] ERROR: Unexpected error - {str(e)}")
-            logger.error(f"Unexpected error during face search: {str(e)}")
+            logger.error("Unexpected error during face search: %s", e)
             return False, [], f"Face search failed: {str(e)}"
     
-    def delete_face(self, face_id: str) -> Tuple[bool, Optional[str]]:
+    def delete_face(self, face_id: str) -> tuple[bool, str | None]:
         """
         Delete a face from the collection.
         
@@ -427,19 +389,20 @@ class AWSRekognitionService:
                 FaceIds=[face_id]
             )
             
-            logger.info(f"✓ Face deleted successfully (FaceID: {face_id})")
+            _clear_search_cache()
+            logger.info("Face deleted successfully (FaceID: %s)", face_id)
             return True, None
             
         except ClientError as e:
             error_message = e.response['Error']['Message']
-            logger.error(f"Failed to delete face: {error_message}")
+            logger.error("Failed to delete face: %s", error_message)
             return False, error_message
         
         except Exception as e:
-            logger.error(f"Unexpected error deleting face: {str(e)}")
+            logger.error("Unexpected error deleting face: %s", e)
             return False, str(e)
     
-    def get_collection_stats(self) -> Optional[Dict]:
+    def get_collection_stats(self) -> dict | None:
         """Get statistics about the face collection"""
         if not self.client:
             return None
@@ -454,10 +417,12 @@ class AWSRekognitionService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to get collection stats: {str(e)}")
+            logger.error("Failed to get collection stats: %s", e)
             return None
 
 
-# Global instance
-rekognition_service = AWSRekognitionService()
+@lru_cache(maxsize=1)
+def get_rekognition_service() -> AWSRekognitionService:
+    """Shared service instance, created on first use so importing the app makes no AWS calls"""
+    return AWSRekognitionService()
 
@@ -1,28 +1,156 @@
 """
 Face verification service using AWS Rekognition
 """
-import boto3
 import os
-from typing import Dict, Tuple
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
 import requests
-from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse, unquote
+from pathlib import Path
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app.services.aws import REKOGNITION_CLIENT_CONFIG, get_client
+from app.services.images import prepare_image_bytes
+
+logger = logging.getLogger(__name__)
+
+# Image downloads are network-bound, so independent fetches run side by side
+_DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="face-download")
+
+# (connect, read) timeouts for image downloads
+DOWNLOAD_TIMEOUT = (3.05, 10)
+
+# Downloads larger than this are refused before/while reading the body
+MAX_DOWNLOAD_BYTES = 15 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# Verifications in flight per batch; each makes up to two Rekognition calls,
+# so 16 stays under the default 50 TPS
+BATCH_VERIFY_CONCURRENCY = 16
+
+# Onboarding stores selfies as local paths under here (see app/routers/workers.py)
+SELFIE_DIR = Path("uploads/selfies")
+
+# Comma-separated S3 buckets Rekognition may read face images from; S3 URLs
+# for any other bucket are refused
+FACE_IMAGE_S3_BUCKETS = frozenset(
+    bucket.strip() for bucket in os.getenv("FACE_IMAGE_S3_BUCKETS", "").split(",") if bucket.strip()
+)
+
+# bucket.s3.<region>.amazonaws.com/key and s3.<region>.amazonaws.com/bucket/key
+_S3_VIRTUAL_HOST = re.compile(r"^(?P<bucket>.+)\.s3[.-](?:[a-z0-9-]+\.)?amazonaws\.com$")
+_S3_PATH_HOST = re.compile(r"^s3[.-](?:[a-z0-9-]+\.)?amazonaws\.com$")
+
+
+def parse_s3_url(image_url: str) -> Optional[Dict]:
+    """Return a Rekognition S3Object for s3:// and S3 https URLs, else None"""
+    parsed = urlparse(image_url)
+    key = unquote(parsed.path.lstrip("/"))
+    if parsed.scheme == "s3":
+        bucket = parsed.netloc
+    elif parsed.scheme == "https":
+        host = parsed.hostname or ""
+        match = _S3_VIRTUAL_HOST.match(host)
+        if match:
+            bucket = match.group("bucket")
+        elif _S3_PATH_HOST.match(host):
+            bucket, _, key = key.partition("/")
+        else:
+            return None
+    else:
+        return None
+    
+    if not bucket or not key:
+        return None
+    return {'Bucket': bucket, 'Name': key}
+
+
+def validate_image_url(image_url: str) -> Optional[Dict]:
+    """
+    Check a client-supplied image URL: only http(s) and S3 URLs on an allowed
+    bucket are accepted. Returns the S3Object for S3 URLs, None for http(s);
+    raises ValueError for anything else.
+    """
+    s3_object = parse_s3_url(image_url)
+    if s3_object:
+        if s3_object['Bucket'] not in FACE_IMAGE_S3_BUCKETS:
+            raise ValueError(f"S3 bucket '{s3_object['Bucket']}' is not allowed")
+        return s3_object
+    if urlparse(image_url).scheme not in ("http", "https"):
+        raise ValueError("Image URL must be an http(s) or allowed S3 URL")
+    return None
+
+
+def read_selfie_file(path: str) -> bytes:
+    """Read a stored selfie from disk (must resolve under SELFIE_DIR, capped at MAX_DOWNLOAD_BYTES)"""
+    resolved = Path(path).resolve()
+    if not resolved.is_relative_to(SELFIE_DIR.resolve()):
+        raise ValueError("Selfie path is outside the selfie upload directory")
+    with resolved.open("rb") as f:
+        image_bytes = f.read(MAX_DOWNLOAD_BYTES + 1)
+    if len(image_bytes) > MAX_DOWNLOAD_BYTES:
+        raise ValueError(f"Image larger than {MAX_DOWNLOAD_BYTES} bytes")
+    return image_bytes
 
 
 class FaceVerificationService:
+    __slots__ = ('rekognition', 'http')
+    
     def __init__(self):
         # AWS Rekognition client
-        self.rekognition = boto3.client(
+        self.rekognition = get_client(
             'rekognition',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
+            region_name=os.getenv('AWS_REGION', 'us-east-1'),
+            config=REKOGNITION_CLIENT_CONFIG
+        )
+        
+        # Keep-alive HTTP session so repeat downloads from the same host reuse connections
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
         )
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
     
     def download_image(self, image_url: str) -> bytes:
-        """Download image from URL"""
-        response = requests.get(image_url)
-        response.raise_for_status()
-        return response.content
+        """Download image from URL (streamed, capped at MAX_DOWNLOAD_BYTES)"""
+        with self.http.get(image_url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit() and int(content_length) > MAX_DOWNLOAD_BYTES:
+                raise ValueError(f"Image too large ({content_length} bytes)")
+            
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                received += len(chunk)
+                if received > MAX_DOWNLOAD_BYTES:
+                    raise ValueError(f"Image larger than {MAX_DOWNLOAD_BYTES} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+    
+    def load_image(self, image_url: str, allow_local: bool = False) -> Dict:
+        """
+        Build the Rekognition Image argument for a URL.
+        S3 objects are read by Rekognition directly and http(s) URLs are
+        downloaded. Local paths are only read with allow_local (stored
+        selfies, never client input). Inline bytes are downscaled once
+        here, so every Rekognition call reuses them.
+        """
+        if allow_local and not urlparse(image_url).scheme:
+            image_bytes = read_selfie_file(image_url)
+        else:
+            s3_object = validate_image_url(image_url)
+            if s3_object:
+                return {'S3Object': s3_object}
+            image_bytes = self.download_image(image_url)
+        return {'Bytes': prepare_image_bytes(image_bytes)}
     
     def compare_faces(self, source_image_url: str, target_image_url: str) -> Dict:
         """
@@ -30,14 +158,23 @@ class FaceVerificationService:
         Returns match score and confidence
         """
         try:
-            # Download images
-            source_bytes = self.download_image(source_image_url)
-            target_bytes = self.download_image(target_image_url)
-            
+            # Load both images concurrently
+            source_image, target_image = _DOWNLOAD_POOL.map(
+                self.load_image, (source_image_url, target_image_url)
+            )
+        except Exception as e:
+            logger.error("Error comparing faces: %s", e)
+            raise Exception(f"Face comparison failed: {str(e)}")
+        
+        return self.compare_face_images(source_image, target_image)
+    
+    def compare_face_images(self, source_image: Dict, target_image: Dict) -> Dict:
+        """Compare two faces given as Rekognition Image arguments (Bytes or S3Object)"""
+        try:
             # Compare faces
             response = self.rekognition.compare_faces(
-                SourceImage={'Bytes': source_bytes},
-                TargetImage={'Bytes': target_bytes},
+                SourceImage=source_image,
+                TargetImage=target_image,
                 SimilarityThreshold=70  # Minimum similarity threshold
             )
             
@@ -56,17 +193,20 @@ class FaceVerificationService:
                 }
         
         except Exception as e:
-            print(f"Error comparing faces: {str(e)}")
+            logger.error("Error comparing faces: %s", e)
             raise Exception(f"Face comparison failed: {str(e)}")
     
-    def detect_faces(self, image_url: str) -> Dict:
-        """Detect faces in an image"""
+    def detect_faces(
+        self,
+        image_url: str,
+        image: Optional[Dict] = None,
+        attributes: Tuple[str, ...] = ('ALL',)
+    ) -> Dict:
+        """Detect faces in an image (pass `image` to reuse an already-loaded one)"""
         try:
-            image_bytes = self.download_image(image_url)
-            
             response = self.rekognition.detect_faces(
-                Image={'Bytes': image_bytes},
-                Attributes=['ALL']
+                Image=image or self.load_image(image_url),
+                Attributes=list(attributes)
             )
             
             if response['FaceDetails']:
@@ -84,16 +224,17 @@ class FaceVerificationService:
                 }
         
         except Exception as e:
-            print(f"Error detecting faces: {str(e)}")
+            logger.error("Error detecting faces: %s", e)
             raise Exception(f"Face detection failed: {str(e)}")
     
-    def check_liveness(self, image_url: str) -> Dict:
+    def check_liveness(self, image_url: str, image: Optional[Dict] = None) -> Dict:
         """
         Basic liveness check
         In production, use AWS Rekognition Liveness API or similar
         """
         try:
-            face_details = self.detect_faces(image_url)
+            # Only the detection confidence is used, which DEFAULT attributes include
+            face_details = self.detect_faces(image_url, image, attributes=('DEFAULT',))
             
             if not face_details['face_detected']:
                 return {
@@ -113,7 +254,7 @@ class FaceVerificationService:
             }
         
         except Exception as e:
-            print(f"Error checking liveness: {str(e)}")
+            logger.error("Error checking liveness: %s", e)
             raise Exception(f"Liveness check failed: {str(e)}")
     
     def verify_worker_face(self, worker_selfie_url: str, live_image_url: str) -> Tuple[bool, float, bool]:
@@ -121,20 +262,57 @@ class FaceVerificationService:
         Complete face verification workflow
         Returns: (is_match, match_score, is_live)
         """
+        # Fetch the stored selfie while the live image is checked
+        selfie_future = _DOWNLOAD_POOL.submit(self.load_image, worker_selfie_url, True)
+        
+        # Load the live image once; liveness and comparison both use it
+        try:
+            live_image = self.load_image(live_image_url)
+        except Exception as e:
+            selfie_future.cancel()
+            logger.error("Error checking liveness: %s", e)
+            raise Exception(f"Liveness check failed: {str(e)}")
+        
         # Check liveness of live image
-        liveness = self.check_liveness(live_image_url)
+        try:
+            liveness = self.check_liveness(live_image_url, live_image)
+        except Exception:
+            selfie_future.cancel()
+            raise
         
         if not liveness['is_live']:
+            selfie_future.cancel()
             return False, 0.0, False
         
         # Compare faces
-        comparison = self.compare_faces(worker_selfie_url, live_image_url)
+        try:
+            selfie_image = selfie_future.result()
+        except Exception as e:
+            logger.error("Error comparing faces: %s", e)
+            raise Exception(f"Face comparison failed: {str(e)}")
+        comparison = self.compare_face_images(selfie_image, live_image)
         
         return (
             comparison['is_match'],
             comparison['similarity'],
             liveness['is_live']
         )
+    
+    async def verify_workers_batch(
+        self,
+        pairs: Sequence[Tuple[str, str]]
+    ) -> List[Tuple[bool, float, bool] | BaseException]:
+        """
+        Run verify_worker_face for many (selfie_url, live_image_url) pairs concurrently.
+        Results keep the input order; a failed pair yields its exception instead of a tuple.
+        """
+        semaphore = asyncio.Semaphore(BATCH_VERIFY_CONCURRENCY)
+        
+        async def verify_one(pair: Tuple[str, str]):
+            async with semaphore:
+                return await asyncio.to_thread(self.verify_worker_face, *pair)
+        
+        return await asyncio.gather(*(verify_one(pair) for pair in pairs), return_exceptions=True)
 
 
 face_verification_service = FaceVerificationService()
@@ -0,0 +1,50 @@
+"""
+Image helpers shared by the Rekognition-backed services
+"""
+import io
+import logging
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Rekognition gains no accuracy beyond ~1024px for face work, so large
+# images are downscaled before upload to cut request size and latency
+REKOGNITION_MAX_DIMENSION = 1024
+REKOGNITION_JPEG_QUALITY = 85
+REKOGNITION_RESIZE_MIN_BYTES = 200_000
+
+# Synchronous Rekognition calls reject inline image bytes above 5MB
+REKOGNITION_MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+
+def prepare_image_bytes(image_bytes: bytes) -> bytes:
+    """
+    Shrink an image for Rekognition (max 1024px, JPEG q85).
+
+    Small images are returned untouched, and any decode/encode failure falls
+    back to the original bytes so AWS reports the real error. Raises
+    ValueError if the result is still over Rekognition's 5MB limit.
+    """
+    prepared = image_bytes
+    if len(image_bytes) >= REKOGNITION_RESIZE_MIN_BYTES:
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as image:
+                if max(image.size) <= REKOGNITION_MAX_DIMENSION and len(image_bytes) <= REKOGNITION_MAX_IMAGE_BYTES:
+                    return image_bytes
+
+                image = ImageOps.exif_transpose(image)
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                image.thumbnail((REKOGNITION_MAX_DIMENSION, REKOGNITION_MAX_DIMENSION), Image.Resampling.LANCZOS)
+
+                buffer = io.BytesIO()
+                image.save(buffer, "JPEG", quality=REKOGNITION_JPEG_QUALITY, optimize=True)
+
+            if buffer.tell() < len(image_bytes):
+                prepared = buffer.getvalue()
+        except Exception as e:
+            logger.warning("Could not downscale image for Rekognition, sending original: %s", e)
+
+    if len(prepared) > REKOGNITION_MAX_IMAGE_BYTES:
+        raise ValueError(f"Image too large for Rekognition ({len(prepared)} bytes, max {REKOGNITION_MAX_IMAGE_BYTES})")
+    return prepared
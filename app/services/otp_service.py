@@ -3,15 +3,54 @@ OTP service for email and SMS
 """
 import smtplib
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.models import OTPVerification
 from app.auth import generate_otp
 import os
+import logging
+import threading
+from string import Template
+
+logger = logging.getLogger(__name__)
+
+SMTP_TIMEOUT_SECONDS = 10
+OTP_VALIDITY = timedelta(minutes=10)
+
+# Fixed OTP for automated test runs; only honoured when APP_ENV=test
+TEST_OTP = os.getenv("TEST_OTP") if os.getenv("APP_ENV") == "test" else None
+
+# OTP email body, parsed once and filled in per send
+_OTP_EMAIL_TEMPLATE = Template("""
+<html>
+    <body style="font-family: Arial, sans-serif; padding: 20px;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: #f9f9f9; padding: 30px; border-radius: 10px;">
+            <h2 style="color: #2563eb;">Jan Suraksha</h2>
+            <h3 style="color: #333;">Your OTP Code</h3>
+            <p style="color: #666; font-size: 16px;">
+                Your OTP for $purpose is:
+            </p>
+            <div style="background-color: #2563eb; color: white; padding: 20px; text-align: center; font-size: 32px; font-weight: bold; letter-spacing: 8px; border-radius: 5px; margin: 20px 0;">
+                $otp
+            </div>
+            <p style="color: #666; font-size: 14px;">
+                This OTP is valid for 10 minutes. Do not share this code with anyone.
+            </p>
+            <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+            <p style="color: #999; font-size: 12px;">
+                This is an automated email from Jan Suraksha platform. Please do not reply to this email.
+            </p>
+        </div>
+    </body>
+</html>
+""")
 
 
 class OTPService:
+    __slots__ = ('smtp_host', 'smtp_port', 'smtp_user', 'smtp_password', 'from_email', 'from_name', 'from_header',
+                 '_smtp', '_smtp_lock')
+    
     def __init__(self):
         self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
@@ -19,61 +58,68 @@ class OTPService:
         self.smtp_password = os.getenv("SMTP_PASSWORD")
         self.from_email = os.getenv("FROM_EMAIL", self.smtp_user)
         self.from_name = os.getenv("FROM_NAME", "Jan Suraksha")
+        self.from_header = f"{self.from_name} <{self.from_email}>"
+        # One authenticated SMTP connection reused across sends (guarded by the lock)
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+    
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """Open, STARTTLS and log in a new SMTP connection"""
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            server.starttls()
+            if self.smtp_user and self.smtp_password:
+                server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _close_smtp(self):
+        """Drop the cached SMTP connection"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+    
+    def _send_message(self, message: MIMEText):
+        """Send over the cached connection, reconnecting once if the server dropped it"""
+        with self._smtp_lock:
+            for attempt in range(2):
+                if self._smtp is None:
+                    self._smtp = self._connect_smtp()
+                try:
+                    self._smtp.send_message(message)
+                    return
+                except smtplib.SMTPServerDisconnected:
+                    self._smtp = None
+                    if attempt:
+                        raise
+                except Exception:
+                    self._close_smtp()
+                    raise
     
     def send_email_otp(self, email: str, otp: str, purpose: str) -> bool:
         """Send OTP via email"""
-        print(f"\n[OTP-EMAIL] Sending OTP to {email}")
-        print(f"[OTP-EMAIL] Purpose: {purpose}")
-        print(f"[OTP-EMAIL] OTP Code: {otp}")
+        logger.debug("Sending %s OTP to %s", purpose, email)
         try:
             subject = f"Your Jan Suraksha OTP - {otp}"
             
-            # Create HTML email
-            html_content = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; padding: 20px;">
-                    <div style="max-width: 600px; margin: 0 auto; background-color: #f9f9f9; padding: 30px; border-radius: 10px;">
-                        <h2 style="color: #2563eb;">Jan Suraksha</h2>
-                        <h3 style="color: #333;">Your OTP Code</h3>
-                        <p style="color: #666; font-size: 16px;">
-                            Your OTP for {purpose} is:
-                        </p>
-                        <div style="background-color: #2563eb; color: white; padding: 20px; text-align: center; font-size: 32px; font-weight: bold; letter-spacing: 8px; border-radius: 5px; margin: 20px 0;">
-                            {otp}
-                        </div>
-                        <p style="color: #666; font-size: 14px;">
-                            This OTP is valid for 10 minutes. Do not share this code with anyone.
-                        </p>
-                        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                        <p style="color: #999; font-size: 12px;">
-                            This is an automated email from Jan Suraksha platform. Please do not reply to this email.
-                        </p>
-                    </div>
-                </body>
-            </html>
-            """
-            
             # Create message
-            message = MIMEMultipart("alternative")
+            message = MIMEText(_OTP_EMAIL_TEMPLATE.substitute(otp=otp, purpose=purpose), "html")
             message["Subject"] = subject
-            message["From"] = f"{self.from_name} <{self.from_email}>"
+            message["From"] = self.from_header
             message["To"] = email
             
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
             # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                if self.smtp_user and self.smtp_password:
-                    server.login(self.smtp_user, self.smtp_password)
-                server.send_message(message)
+            self._send_message(message)
             
-            print(f"[OTP-EMAIL] ✓ OTP sent successfully to {email}")
+            logger.info("OTP email sent to %s", email)
             return True
         except Exception as e:
-            print(f"[OTP-EMAIL] ✗ Error sending email: {str(e)}")
+            logger.error("Error sending OTP email to %s: %s", email, e)
             return False
     
     def send_sms_otp(self, mobile: str, otp: str, purpose: str) -> bool:
@@ -83,23 +129,19 @@ class OTPService:
         For now, just log it
         """
         # TODO: Integrate with SMS gateway
-        print(f"\n[OTP-SMS] Sending OTP to {mobile}")
-        print(f"[OTP-SMS] Purpose: {purpose}")
-        print(f"[OTP-SMS] OTP Code: {otp}")
-        print(f"[OTP-SMS] ✓ OTP logged (SMS gateway not configured)")
+        # Logged at INFO: this is the only way to read the code in development
+        logger.info("SMS gateway not configured - %s OTP for %s: %s", purpose, mobile, otp)
         # In development, always return True
         return True
     
     def create_otp(self, db: Session, email: str = None, mobile: str = None, purpose: str = "verification") -> str:
-        """Create and store OTP"""
-        print(f"\n[OTP-SERVICE] Creating OTP")
-        print(f"[OTP-SERVICE] Email: {email}, Mobile: {mobile}, Purpose: {purpose}")
+        """Create and store OTP (send it with deliver_otp)"""
+        logger.debug("Creating %s OTP - email=%s mobile=%s", purpose, email, mobile)
         
-        otp = generate_otp(6)
-        expires_at = datetime.utcnow() + timedelta(minutes=10)
+        otp = TEST_OTP or generate_otp(6)
+        expires_at = datetime.now(timezone.utc) + OTP_VALIDITY
         
-        print(f"[OTP-SERVICE] Generated OTP: {otp}")
-        print(f"[OTP-SERVICE] Expires at: {expires_at}")
+        logger.debug("Generated OTP %s (expires %s)", otp, expires_at)
         
         # Store in database
         otp_record = OTPVerification(
@@ -111,76 +153,65 @@ class OTPService:
         )
         db.add(otp_record)
         db.commit()
-        print(f"[OTP-SERVICE] OTP stored in database")
-        
-        # Send OTP
-        if email:
-            self.send_email_otp(email, otp, purpose)
-        elif mobile:
-            self.send_sms_otp(mobile, otp, purpose)
+        logger.debug("OTP stored in database")
         
         return otp
     
-    def verify_otp(self, db: Session, otp: str, email: str = None, mobile: str = None, purpose: str = "verification") -> bool:
-        """Verify OTP"""
-        print(f"\n[OTP-SERVICE] Verifying OTP")
-        print(f"[OTP-SERVICE] OTP: {otp}, Email: {email}, Mobile: {mobile}, Purpose: {purpose}")
-        
-        # First, check all OTPs for this email/mobile to debug
+    def deliver_otp(self, otp: str, email: str = None, mobile: str = None, purpose: str = "verification") -> bool:
+        """Send a stored OTP by email, or SMS when there is no email (safe to run as a background task)"""
         if email:
-            all_otps = db.query(OTPVerification).filter(OTPVerification.email == email).all()
-            print(f"[OTP-SERVICE] DEBUG: Found {len(all_otps)} total OTP(s) for email {email}")
-            for idx, otp_rec in enumerate(all_otps):
-                print(f"  [{idx+1}] Code: {otp_rec.otp_code}, Purpose: {otp_rec.purpose}, Verified: {otp_rec.is_verified}, Expires: {otp_rec.expires_at}, Current Time: {datetime.utcnow()}")
-        elif mobile:
-            all_otps = db.query(OTPVerification).filter(OTPVerification.mobile == mobile).all()
-            print(f"[OTP-SERVICE] DEBUG: Found {len(all_otps)} total OTP(s) for mobile {mobile}")
-            for idx, otp_rec in enumerate(all_otps):
-                print(f"  [{idx+1}] Code: {otp_rec.otp_code}, Purpose: {otp_rec.purpose}, Verified: {otp_rec.is_verified}, Expires: {otp_rec.expires_at}")
+            return self.send_email_otp(email, otp, purpose)
+        if mobile:
+            return self.send_sms_otp(mobile, otp, purpose)
+        return False
+    
+    def verify_otp(self, db: Session, otp: str, email: str = None, mobile: str = None, purpose: str = "verification") -> bool:
+        """Verify OTP (marks it verified, or counts a failed attempt, in one commit)"""
+        logger.debug("Verifying %s OTP %s - email=%s mobile=%s", purpose, otp, email, mobile)
         
-        query = db.query(OTPVerification).filter(
-            OTPVerification.otp_code == otp,
+        # One timestamp for the expiry check and verified_at
+        now = datetime.now(timezone.utc)
+        # The caller's own outstanding OTPs for this purpose
+        pending = [
             OTPVerification.purpose == purpose,
             OTPVerification.is_verified == False,
-            OTPVerification.expires_at > datetime.utcnow()
-        )
-        
+            OTPVerification.expires_at > now
+        ]
         if email:
-            query = query.filter(OTPVerification.email == email)
+            pending.append(OTPVerification.email == email)
         elif mobile:
-            query = query.filter(OTPVerification.mobile == mobile)
+            pending.append(OTPVerification.mobile == mobile)
+        else:
+            logger.debug("No email or mobile given")
+            return False
         
-        otp_record = query.first()
+        # Match and mark as verified in a single statement
+        result = db.execute(
+            update(OTPVerification)
+            .where(OTPVerification.otp_code == otp, *pending)
+            .values(is_verified=True, verified_at=now)
+            .execution_options(synchronize_session=False)
+        )
         
-        if otp_record:
-            # Mark as verified
-            otp_record.is_verified = True
-            otp_record.verified_at = datetime.utcnow()
+        if result.rowcount:
             db.commit()
-            print(f"[OTP-SERVICE] ✓ OTP verified successfully")
+            logger.debug("OTP verified")
             return True
         
-        # Check if OTP exists but doesn't match all conditions
-        otp_any = db.query(OTPVerification).filter(OTPVerification.otp_code == otp).first()
-        if otp_any:
-            print(f"[OTP-SERVICE] ✗ OTP found but conditions not met:")
-            print(f"  - Purpose match: {otp_any.purpose == purpose} (expected: {purpose}, got: {otp_any.purpose})")
-            print(f"  - Not verified: {not otp_any.is_verified}")
-            print(f"  - Not expired: {otp_any.expires_at > datetime.utcnow()}")
-            if email:
-                print(f"  - Email match: {otp_any.email == email}")
-            if mobile:
-                print(f"  - Mobile match: {otp_any.mobile == mobile}")
-            
-            # Increment attempts
-            otp_any.attempts += 1
+        # Count the failed attempt against the caller's outstanding OTPs only
+        result = db.execute(
+            update(OTPVerification)
+            .where(*pending)
+            .values(attempts=OTPVerification.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
             db.commit()
-            print(f"[OTP-SERVICE] ✗ Invalid OTP (attempts: {otp_any.attempts})")
+            logger.debug("Invalid OTP")
         else:
-            print(f"[OTP-SERVICE] ✗ OTP not found in database at all")
+            logger.debug("No pending OTP for this contact/purpose (already used or expired)")
         
         return False
 
-
 otp_service = OTPService()
 
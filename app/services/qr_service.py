@@ -4,32 +4,63 @@ QR Code generation service
 import qrcode
 from pathlib import Path
 from typing import Optional
+from functools import lru_cache
+import threading
 import os
 
+# Read once at import; restart the process to pick up changes
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+QR_DIR = Path("uploads/qrcodes")
+
+_thread_local = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _ensure_dir() -> Path:
+    """Create the QR codes directory (once per process)"""
+    QR_DIR.mkdir(parents=True, exist_ok=True)
+    return QR_DIR
+
+
+def _get_qr_builder() -> qrcode.QRCode:
+    """This thread's reusable QRCode builder (QRCode objects are not thread-safe)"""
+    qr = getattr(_thread_local, "qr", None)
+    if qr is None:
+        qr = _thread_local.qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+    return qr
+
 
 class QRCodeService:
+    __slots__ = ('base_url', 'qr_dir')
+    
     def __init__(self):
         # Use environment variable or default to localhost for development
-        self.base_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
+        self.base_url = FRONTEND_URL
         # Create QR codes directory
-        self.qr_dir = Path("uploads/qrcodes")
-        self.qr_dir.mkdir(parents=True, exist_ok=True)
+        self.qr_dir = _ensure_dir()
     
-    def generate_worker_qr(self, worker_id: str) -> str:
+    def generate_worker_qr(self, worker_id: str, overwrite: bool = False) -> str:
         """
         Generate QR code for worker verification
-        Saves to file and returns file path
+        Saves to file and returns file path (an existing file is reused unless overwrite=True)
         """
+        filepath = self.qr_dir / f"{worker_id}.png"
+        if not overwrite and filepath.exists():
+            return str(filepath).replace("\\", "/")
+        
         # Create verification URL - points to frontend verify page
         verification_url = f"{self.base_url}/verify?id={worker_id}"
         
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
+        # Generate QR code (reset the builder so fitting starts from version 1 again)
+        qr = _get_qr_builder()
+        qr.clear()
+        qr.version = 1
         qr.add_data(verification_url)
         qr.make(fit=True)
         
@@ -37,8 +68,6 @@ class QRCodeService:
         img = qr.make_image(fill_color="black", back_color="white")
         
         # Save to file
-        filename = f"{worker_id}.png"
-        filepath = self.qr_dir / filename
         img.save(filepath)
         
         # Return relative path for database storage
@@ -47,8 +76,7 @@ class QRCodeService:
     def generate_verification_endpoint(self, worker_id: str) -> str:
         """Generate public verification endpoint URL"""
         # Backend API endpoint for verification
-        backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-        return f"{backend_url}/api/verify/worker/{worker_id}"
+        return f"{BACKEND_URL}/api/verify/worker/{worker_id}"
 
 
 qr_service = QRCodeService()
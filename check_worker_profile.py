@@ -2,14 +2,17 @@
 Quick script to check worker profile in database
 Run: python check_worker_profile.py
 """
+from sqlalchemy.orm import joinedload
 from app.database import SessionLocal
-from app.models import Worker, User
+from app.models import User
 
 def check_worker_profile():
     db = SessionLocal()
     try:
-        # Get all users with worker role
-        users = db.query(User).filter(User.role.in_(['worker', 'delivery_worker', 'aeps_agent'])).all()
+        # Get all users with worker role, with their worker profiles in the same query
+        users = db.query(User).options(joinedload(User.worker)).filter(
+            User.role.in_(['worker', 'delivery_worker', 'aeps_agent'])
+        ).all()
         
         print("\n" + "="*80)
         print("WORKER PROFILES IN DATABASE")
@@ -27,7 +30,7 @@ def check_worker_profile():
             print(f"   Role: {user.role.value}")
             
             # Check for worker profile
-            worker = db.query(Worker).filter(Worker.user_id == user.id).first()
+            worker = user.worker
             
             if worker:
                 print(f"\n   ✅ WORKER PROFILE EXISTS")
@@ -2,6 +2,7 @@
 Create police officer profile for testing
 Run: python create_police_officer.py
 """
+from sqlalchemy.orm import joinedload
 from app.database import SessionLocal
 from app.models import PoliceOfficer, User
 
@@ -9,7 +10,7 @@ def create_police_officer():
     db = SessionLocal()
     try:
         # Find police users without officer profile
-        police_users = db.query(User).filter(User.role == 'police').all()
+        police_users = db.query(User).options(joinedload(User.police_officer)).filter(User.role == 'police').all()
         
         if not police_users:
             print("❌ No users with police role found!")
@@ -27,9 +28,7 @@ def create_police_officer():
             print(f"   Mobile: {user.mobile}")
             
             # Check if officer profile exists
-            existing = db.query(PoliceOfficer).filter(
-                PoliceOfficer.user_id == user.id
-            ).first()
+            existing = user.police_officer
             
             if existing:
                 print(f"   ✅ Officer profile already exists!")
@@ -2,7 +2,7 @@
 Database initialization script
 Creates tables and optional test data
 """
-from app.database import engine, Base, SessionLocal
+from app.database import SessionLocal, create_missing_tables
 from app.models import User, UserRole
 from app.auth import get_password_hash
 import sys
@@ -11,8 +11,11 @@ import sys
 def init_database():
     """Initialize database tables"""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ Database tables created successfully!")
+    created = create_missing_tables()
+    if created:
+        print(f"✓ Created tables: {', '.join(created)}")
+    else:
+        print("✓ All database tables already exist")
 
 
 def create_admin_user():
@@ -0,0 +1,56 @@
+"""
+Database migration: Add indexes for hot query paths
+
+Creates the secondary indexes declared in app/models.py on databases that were
+created before the index existed (create_all never alters existing tables).
+
+Safe to run multiple times - indexes that already exist are skipped.
+"""
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app.database import get_script_engine
+
+# (table, index name, column list)
+INDEXES = [
+    ("police_verifications", "ix_pv_worker_created", "worker_id, created_at DESC"),
+    ("otp_verifications", "ix_otp_lookup", "otp_code, purpose"),
+    ("otp_verifications", "ix_otp_email", "email"),
+    ("otp_verifications", "ix_otp_mobile", "mobile"),
+    ("otp_verifications", "ix_otp_expires_at", "expires_at"),
+    ("workers", "ix_workers_verified_qr", "verification_status, qr_code_url"),
+]
+
+
+def add_query_indexes():
+    """Create any missing indexes from INDEXES"""
+    print("\n" + "="*60)
+    print("MIGRATION: Add Query Indexes")
+    print("="*60 + "\n")
+    
+    engine = get_script_engine()
+    inspector = inspect(engine)
+    
+    created = 0
+    with engine.begin() as connection:
+        for table, name, columns in INDEXES:
+            existing = {index["name"] for index in inspector.get_indexes(table)}
+            if name in existing:
+                print(f"[SKIP] {name} already exists on {table}")
+                continue
+            
+            connection.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+            print(f"[OK] Created {name} on {table} ({columns})")
+            created += 1
+    
+    print("-" * 60)
+    print(f"\n[SUCCESS] Migration complete! Created {created} index(es)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    add_query_indexes()
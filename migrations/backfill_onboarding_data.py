@@ -0,0 +1,45 @@
+"""
+Database migration: Make workers.onboarding_data NOT NULL
+
+Older worker rows may have onboarding_data = NULL. The application now treats the
+column as always holding a JSON object (default {}), so this script backfills
+NULLs with an empty object and then adds the NOT NULL constraint.
+
+Safe to run multiple times (idempotent).
+"""
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import get_script_engine
+
+
+def backfill_onboarding_data():
+    """Backfill NULL onboarding_data and enforce NOT NULL"""
+    print("\n" + "="*60)
+    print("MIGRATION: Backfill workers.onboarding_data")
+    print("="*60 + "\n")
+    
+    engine = get_script_engine()
+    
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            "UPDATE workers SET onboarding_data = JSON_OBJECT() WHERE onboarding_data IS NULL"
+        ))
+        print(f"[OK] Backfilled {result.rowcount} worker(s) with an empty onboarding_data object")
+        
+        connection.execute(text(
+            "ALTER TABLE workers MODIFY onboarding_data JSON NOT NULL"
+        ))
+        print("[OK] workers.onboarding_data is now NOT NULL")
+    
+    print("-" * 60)
+    print("\n[SUCCESS] Migration complete!")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    backfill_onboarding_data()
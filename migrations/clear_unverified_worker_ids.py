@@ -13,10 +13,8 @@ import os
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from app.models import Worker, VerificationStatus
-from app.database import DATABASE_URL
+from app.database import session_scope
 
 def clear_unverified_worker_ids():
     """Clear worker_id for all unverified workers"""
@@ -24,54 +22,47 @@ def clear_unverified_worker_ids():
     print("MIGRATION: Clear Worker IDs for Unverified Workers")
     print("="*60 + "\n")
     
-    # Create database session
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
-    
-    try:
-        # Find all workers with worker_id but not verified
-        workers = db.query(Worker).filter(
-            Worker.worker_id.isnot(None),
-            Worker.verification_status != VerificationStatus.VERIFIED
-        ).all()
-        
-        print(f"Found {len(workers)} workers with premature worker_ids")
-        print("-" * 60)
-        
-        if len(workers) == 0:
-            print("✓ No workers found with premature worker_ids")
-            print("✓ Database is clean!")
-            return
-        
-        # Clear worker_id for each unverified worker
-        cleared_count = 0
-        for worker in workers:
-            print(f"\nWorker Internal ID: {worker.id}")
-            print(f"  - Worker ID (being cleared): {worker.worker_id}")
-            print(f"  - Category: {worker.category.value if worker.category else 'N/A'}")
-            print(f"  - Verification Status: {worker.verification_status.value if worker.verification_status else 'N/A'}")
-            print(f"  - Onboarding Step: {worker.onboarding_step}/6")
+    with session_scope() as db:
+        try:
+            # Find all workers with worker_id but not verified
+            premature = db.query(Worker).filter(
+                Worker.worker_id.isnot(None),
+                Worker.verification_status != VerificationStatus.VERIFIED
+            )
+            total = premature.count()
             
-            # Clear the worker_id
-            worker.worker_id = None
-            cleared_count += 1
-        
-        # Commit changes
-        db.commit()
-        
-        print("\n" + "="*60)
-        print(f"✓ Successfully cleared {cleared_count} worker IDs")
-        print("="*60)
-        print("\nThese worker IDs will be regenerated when police approve verification.")
-        
-    except Exception as e:
-        print(f"\n✗ ERROR: {str(e)}")
-        db.rollback()
-        raise
-    
-    finally:
-        db.close()
+            print(f"Found {total} workers with premature worker_ids")
+            print("-" * 60)
+            
+            if total == 0:
+                print("✓ No workers found with premature worker_ids")
+                print("✓ Database is clean!")
+                return
+            
+            # List what is about to be cleared (only the printed columns, streamed in batches)
+            rows = premature.with_entities(
+                Worker.id, Worker.worker_id, Worker.category,
+                Worker.verification_status, Worker.onboarding_step
+            ).yield_per(500)
+            for row in rows:
+                print(f"\nWorker Internal ID: {row.id}")
+                print(f"  - Worker ID (being cleared): {row.worker_id}")
+                print(f"  - Category: {row.category.value if row.category else 'N/A'}")
+                print(f"  - Verification Status: {row.verification_status.value if row.verification_status else 'N/A'}")
+                print(f"  - Onboarding Step: {row.onboarding_step}/6")
+            
+            # Clear all of them with a single UPDATE
+            cleared_count = premature.update({Worker.worker_id: None}, synchronize_session=False)
+            db.commit()
+            
+            print("\n" + "="*60)
+            print(f"✓ Successfully cleared {cleared_count} worker IDs")
+            print("="*60)
+            print("\nThese worker IDs will be regenerated when police approve verification.")
+            
+        except Exception as e:
+            print(f"\n✗ ERROR: {str(e)}")
+            raise
 
 if __name__ == "__main__":
     print("\n⚠️  WARNING: This will clear worker_ids for unverified workers!")
@@ -3,16 +3,21 @@ Create worker_activities table and populate with dummy data
 """
 import sys
 import os
+import logging
 from datetime import datetime, timedelta
 import random
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select, text
 from app.models import Worker, WorkerActivity, WorkerCategory
-from app.database import DATABASE_URL
+from app.database import get_script_engine
+
+logger = logging.getLogger(__name__)
+
+# Per-worker details are DEBUG (--verbose); INFO gets a progress line this often
+PROGRESS_EVERY = 1000
 
 # Sample data for realistic dummy activities
 DELIVERY_PARTNERS = ["Flipkart", "Amazon", "Swiggy", "Zomato", "Delhivery", "BlueDart"]
@@ -26,188 +31,304 @@ BIHAR_AREAS = [
 TRANSACTION_TYPES = ["Cash Withdrawal", "Balance Inquiry", "Mini Statement", "Deposit", "Aadhaar Pay"]
 BANK_NAMES = ["SBI", "PNB", "BOI", "HDFC", "ICICI", "Axis Bank", "Union Bank"]
 
+CASH_TRANSACTION_TYPES = frozenset(["Cash Withdrawal", "Deposit", "Aadhaar Pay"])
+TRANSACTION_AMOUNTS = [500, 1000, 1500, 2000, 2500, 3000, 5000]
+
+# Population for each random draw, so a batch is sampled with one random.choices call
+ACTIVITY_AGE_OFFSETS = [timedelta(days=d, hours=h) for d in range(15) for h in range(24)]  # last 2 weeks
+PACKAGE_NUMBERS = range(100000, 1000000)
+CONTACT_NUMBERS = range(100000000, 1000000000)
+
+# Small populations are pre-formatted, so rows reuse the strings instead of building them
+PLACES = [(city, f"{area}, {city}, Bihar") for city in BIHAR_CITIES for area in BIHAR_AREAS]  # (city, location)
+PINCODES = [f"80000{n}" for n in range(1, 10)]
+CUSTOMER_NAMES = [f"Customer {n}" for n in range(1, 1000)]
+
+# "%I:%M %p" templates per hour of day, filled with the minute; avoids a
+# strftime call per row when building notes
+CLOCK_TIMES = tuple(f"{(hour - 1) % 12 + 1:02d}:%02d {'AM' if hour < 12 else 'PM'}" for hour in range(24))
+
+# Rows per bulk INSERT batch. PyMySQL rewrites each executemany of a plain
+# "INSERT ... VALUES (...)" (no RETURNING, no trailing semicolon) into multi-row
+# INSERT statements of up to ~1MB, so a batch costs a handful of round trips
+INSERT_CHUNK_SIZE = 10_000
+
+# Built once at import so repeated runs (e.g. in a test harness) reuse the statement
+CREATE_TABLE_STMT = text("""
+CREATE TABLE IF NOT EXISTS worker_activities (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    worker_id INT NOT NULL,
+    activity_type VARCHAR(50) NOT NULL,
+    activity_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    location VARCHAR(500),
+    city VARCHAR(100),
+    state VARCHAR(100),
+    pincode VARCHAR(10),
+    
+    -- Delivery specific
+    package_id VARCHAR(100),
+    delivery_partner VARCHAR(100),
+    package_type VARCHAR(100),
+    recipient_name VARCHAR(255),
+    recipient_contact VARCHAR(20),
+    
+    -- Transaction specific
+    customer_name VARCHAR(255),
+    customer_contact VARCHAR(20),
+    transaction_type VARCHAR(50),
+    transaction_amount FLOAT,
+    bank_name VARCHAR(255),
+    
+    status VARCHAR(50) DEFAULT 'completed',
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE,
+    INDEX idx_worker_id (worker_id),
+    INDEX idx_activity_date (activity_date),
+    INDEX idx_activity_type (activity_type)
+);
+""")
+
 def create_table(engine):
     """Create worker_activities table"""
     print("\n" + "="*60)
     print("Creating worker_activities table...")
     print("="*60 + "\n")
     
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS worker_activities (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        worker_id INT NOT NULL,
-        activity_type VARCHAR(50) NOT NULL,
-        activity_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-        location VARCHAR(500),
-        city VARCHAR(100),
-        state VARCHAR(100),
-        pincode VARCHAR(10),
-        
-        -- Delivery specific
-        package_id VARCHAR(100),
-        delivery_partner VARCHAR(100),
-        package_type VARCHAR(100),
-        recipient_name VARCHAR(255),
-        recipient_contact VARCHAR(20),
-        
-        -- Transaction specific
-        customer_name VARCHAR(255),
-        customer_contact VARCHAR(20),
-        transaction_type VARCHAR(50),
-        transaction_amount FLOAT,
-        bank_name VARCHAR(255),
-        
-        status VARCHAR(50) DEFAULT 'completed',
-        notes TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        
-        FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE,
-        INDEX idx_worker_id (worker_id),
-        INDEX idx_activity_date (activity_date),
-        INDEX idx_activity_type (activity_type)
-    );
-    """
-    
     with engine.connect() as connection:
-        connection.execute(text(create_table_sql))
+        connection.execute(CREATE_TABLE_STMT)
         connection.commit()
     
     print("[OK] Table 'worker_activities' created successfully")
 
 def generate_delivery_activities(worker_id, count=20):
-    """Generate dummy delivery activities"""
-    activities = []
+    """Generate dummy delivery activities (as insert-ready row dicts)"""
     now = datetime.now()
     
-    for i in range(count):
-        # Random date within last 2 weeks
-        days_ago = random.randint(0, 14)
-        hours_ago = random.randint(0, 23)
-        activity_date = now - timedelta(days=days_ago, hours=hours_ago)
-        
-        city = random.choice(BIHAR_CITIES)
-        area = random.choice(BIHAR_AREAS)
-        
-        activity = WorkerActivity(
+    # Draw every random column for the batch up front
+    draws = zip(
+        random.choices(ACTIVITY_AGE_OFFSETS, k=count),
+        random.choices(PLACES, k=count),
+        random.choices(PINCODES, k=count),
+        random.choices(PACKAGE_NUMBERS, k=count),
+        random.choices(DELIVERY_PARTNERS, k=count),
+        random.choices(PACKAGE_TYPES, k=count),
+        random.choices(CUSTOMER_NAMES, k=count),
+        random.choices(CONTACT_NUMBERS, k=count),
+    )
+    
+    activities = []
+    for age, (city, location), pincode, package_number, partner, package_type, customer_name, contact_number in draws:
+        activity_date = now - age
+        activities.append(dict(
             worker_id=worker_id,
             activity_type="delivery",
             activity_date=activity_date,
-            location=f"{area}, {city}, Bihar",
+            location=location,
             city=city,
             state="Bihar",
-            pincode=f"80000{random.randint(1, 9)}",
-            package_id=f"PKG{random.randint(100000, 999999)}",
-            delivery_partner=random.choice(DELIVERY_PARTNERS),
-            package_type=random.choice(PACKAGE_TYPES),
-            recipient_name=f"Customer {random.randint(1, 999)}",
-            recipient_contact=f"9{random.randint(100000000, 999999999)}",
+            pincode=pincode,
+            package_id="PKG%d" % package_number,
+            delivery_partner=partner,
+            package_type=package_type,
+            recipient_name=customer_name,
+            recipient_contact="9%d" % contact_number,
             status="completed",
-            notes=f"Delivered successfully at {activity_date.strftime('%I:%M %p')}"
-        )
-        activities.append(activity)
+            notes=f"Delivered successfully at {CLOCK_TIMES[activity_date.hour] % activity_date.minute}"
+        ))
     
     return activities
 
 def generate_transaction_activities(worker_id, count=20):
-    """Generate dummy transaction activities for AePS agents"""
-    activities = []
+    """Generate dummy transaction activities for AePS agents (as insert-ready row dicts)"""
     now = datetime.now()
     
-    for i in range(count):
-        # Random date within last 2 weeks
-        days_ago = random.randint(0, 14)
-        hours_ago = random.randint(0, 23)
-        activity_date = now - timedelta(days=days_ago, hours=hours_ago)
-        
-        city = random.choice(BIHAR_CITIES)
-        area = random.choice(BIHAR_AREAS)
-        trans_type = random.choice(TRANSACTION_TYPES)
-        
-        # Amount only for cash transactions
-        amount = None
-        if trans_type in ["Cash Withdrawal", "Deposit", "Aadhaar Pay"]:
-            amount = random.choice([500, 1000, 1500, 2000, 2500, 3000, 5000])
-        
-        activity = WorkerActivity(
+    # Draw every random column for the batch up front
+    draws = zip(
+        random.choices(ACTIVITY_AGE_OFFSETS, k=count),
+        random.choices(PLACES, k=count),
+        random.choices(TRANSACTION_TYPES, k=count),
+        random.choices(TRANSACTION_AMOUNTS, k=count),
+        random.choices(PINCODES, k=count),
+        random.choices(CUSTOMER_NAMES, k=count),
+        random.choices(CONTACT_NUMBERS, k=count),
+        random.choices(BANK_NAMES, k=count),
+    )
+    
+    activities = []
+    for age, (city, location), trans_type, amount, pincode, customer_name, contact_number, bank_name in draws:
+        activity_date = now - age
+        activities.append(dict(
             worker_id=worker_id,
             activity_type="transaction",
             activity_date=activity_date,
-            location=f"{area}, {city}, Bihar",
+            location=location,
             city=city,
             state="Bihar",
-            pincode=f"80000{random.randint(1, 9)}",
-            customer_name=f"Customer {random.randint(1, 999)}",
-            customer_contact=f"9{random.randint(100000000, 999999999)}",
+            pincode=pincode,
+            customer_name=customer_name,
+            customer_contact="9%d" % contact_number,
             transaction_type=trans_type,
-            transaction_amount=amount,
-            bank_name=random.choice(BANK_NAMES),
+            # Amount only for cash transactions
+            transaction_amount=amount if trans_type in CASH_TRANSACTION_TYPES else None,
+            bank_name=bank_name,
             status="completed",
-            notes=f"Transaction completed at {activity_date.strftime('%I:%M %p')}"
-        )
-        activities.append(activity)
+            notes=f"Transaction completed at {CLOCK_TIMES[activity_date.hour] % activity_date.minute}"
+        ))
     
     return activities
 
-def populate_dummy_data(db):
-    """Add dummy activity data for verified workers"""
+def populate_dummy_data(engine):
+    """Add dummy activity data for verified workers (one transaction, no ORM session)"""
     print("\n" + "="*60)
     print("Populating dummy activity data...")
     print("="*60 + "\n")
     
-    # Get all verified workers
-    workers = db.query(Worker).all()
-    
-    if not workers:
-        print("[WARNING] No workers found in database. Create workers first.")
-        return
-    
-    total_added = 0
-    
-    for worker in workers:
-        print(f"\nWorker ID: {worker.id}")
-        print(f"  Category: {worker.category.value if worker.category else 'N/A'}")
-        print(f"  Worker ID: {worker.worker_id or 'Not assigned'}")
+    with engine.begin() as connection:
+        # Get all verified workers (only the columns used below)
+        workers = connection.execute(select(Worker.id, Worker.category, Worker.worker_id)).all()
         
-        # Generate activities based on category
-        if worker.category == WorkerCategory.DELIVERY_WORKER:
-            activities = generate_delivery_activities(worker.id, count=20)
-            print(f"  [OK] Generated {len(activities)} delivery activities")
-        elif worker.category == WorkerCategory.AEPS_AGENT:
-            activities = generate_transaction_activities(worker.id, count=20)
-            print(f"  [OK] Generated {len(activities)} transaction activities")
-        else:
-            print(f"  [WARNING] Unknown category, skipping...")
-            continue
+        if not workers:
+            print("[WARNING] No workers found in database. Create workers first.")
+            return
         
-        # Add to database
-        for activity in activities:
-            db.add(activity)
+        # Delivery and transaction rows fill different columns, so each kind
+        # gets its own executemany (every row in one batch must share its keys)
+        rows_by_type = {"delivery": [], "transaction": []}
         
-        total_added += len(activities)
-    
-    # Commit all activities
-    db.commit()
+        for done, worker in enumerate(workers, 1):
+            logger.debug("\nWorker ID: %s", worker.id)
+            logger.debug("  Category: %s", worker.category.value if worker.category else 'N/A')
+            logger.debug("  Worker ID: %s", worker.worker_id or 'Not assigned')
+            
+            # Generate activities based on category
+            if worker.category == WorkerCategory.DELIVERY_WORKER:
+                activities = generate_delivery_activities(worker.id, count=20)
+                rows_by_type["delivery"].extend(activities)
+                logger.debug("  [OK] Generated %d delivery activities", len(activities))
+            elif worker.category == WorkerCategory.AEPS_AGENT:
+                activities = generate_transaction_activities(worker.id, count=20)
+                rows_by_type["transaction"].extend(activities)
+                logger.debug("  [OK] Generated %d transaction activities", len(activities))
+            else:
+                logger.warning("  [WARNING] Worker %s: unknown category, skipping...", worker.id)
+            
+            if done % PROGRESS_EVERY == 0:
+                logger.info("  ... generated activities for %d/%d workers", done, len(workers))
+        
+        # Plain Core INSERT executemany in large batches (no ORM objects); committed once by engine.begin()
+        insert_activity = WorkerActivity.__table__.insert()
+        total_added = 0
+        for rows in rows_by_type.values():
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                connection.execute(insert_activity, rows[start:start + INSERT_CHUNK_SIZE])
+            total_added += len(rows)
     
     print("\n" + "="*60)
     print(f"[OK] Successfully added {total_added} activity records")
     print("="*60)
 
+def _random_pick(values, prefix):
+    """SQL expression picking one of `values` at random per row, plus its bind params"""
+    names = [f"{prefix}{i}" for i in range(len(values))]
+    sql = f"ELT(1 + FLOOR(RAND() * {len(values)}), {', '.join(':' + name for name in names)})"
+    return sql, dict(zip(names, values))
+
+def populate_dummy_data_server_side(engine, count=20):
+    """
+    Generate the same dummy activities entirely inside MySQL 8 (recursive CTE),
+    so no rows are built in Python or sent over the wire
+    """
+    print("\n" + "="*60)
+    print("Populating dummy activity data (server-side)...")
+    print("="*60 + "\n")
+    
+    params = {"count": count, "time_format": "%h:%i %p"}
+    picks = {}
+    for name, values in (
+        ("city", BIHAR_CITIES), ("area", BIHAR_AREAS), ("partner", DELIVERY_PARTNERS),
+        ("package_type", PACKAGE_TYPES), ("transaction_type", TRANSACTION_TYPES),
+        ("amount", TRANSACTION_AMOUNTS), ("bank", BANK_NAMES), ("cash", sorted(CASH_TRANSACTION_TYPES))
+    ):
+        picks[name], pick_params = _random_pick(values, f"{name}_")
+        params.update(pick_params)
+    cash_types = ", ".join(f":cash_{i}" for i in range(len(CASH_TRANSACTION_TYPES)))
+    
+    # One row per (worker, n); the derived table fixes each row's random date and
+    # place once (NO_MERGE) so location, city and notes agree with each other
+    random_rows = f"""
+        WITH RECURSIVE seq (n) AS (
+            SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :count
+        )
+        SELECT /*+ NO_MERGE(r) */ {{columns}}
+        FROM (
+            SELECT w.id AS worker_id,
+                   NOW() - INTERVAL FLOOR(RAND() * 15) DAY - INTERVAL FLOOR(RAND() * 24) HOUR AS activity_date,
+                   {picks['city']} AS city,
+                   {picks['area']} AS area,
+                   {picks['transaction_type']} AS transaction_type
+            FROM workers w CROSS JOIN seq
+            WHERE w.category = :category
+        ) AS r
+    """
+    common_columns = "worker_id, activity_type, activity_date, location, city, state, pincode"
+    common_values = (
+        "r.worker_id, :activity_type, r.activity_date, CONCAT(r.area, ', ', r.city, ', Bihar'), "
+        "r.city, 'Bihar', CONCAT('80000', 1 + FLOOR(RAND() * 9))"
+    )
+    
+    delivery_sql = f"""
+        INSERT INTO worker_activities ({common_columns}, package_id, delivery_partner, package_type,
+                                       recipient_name, recipient_contact, status, notes)
+    """ + random_rows.format(columns=f"""
+            {common_values},
+            CONCAT('PKG', 100000 + FLOOR(RAND() * 900000)), {picks['partner']}, {picks['package_type']},
+            CONCAT('Customer ', 1 + FLOOR(RAND() * 999)), CONCAT('9', 100000000 + FLOOR(RAND() * 900000000)),
+            'completed', CONCAT('Delivered successfully at ', DATE_FORMAT(r.activity_date, :time_format))
+    """)
+    transaction_sql = f"""
+        INSERT INTO worker_activities ({common_columns}, customer_name, customer_contact, transaction_type,
+                                       transaction_amount, bank_name, status, notes)
+    """ + random_rows.format(columns=f"""
+            {common_values},
+            CONCAT('Customer ', 1 + FLOOR(RAND() * 999)), CONCAT('9', 100000000 + FLOOR(RAND() * 900000000)),
+            r.transaction_type,
+            CASE WHEN r.transaction_type IN ({cash_types}) THEN {picks['amount']} END,
+            {picks['bank']},
+            'completed', CONCAT('Transaction completed at ', DATE_FORMAT(r.activity_date, :time_format))
+    """)
+    
+    with engine.begin() as connection:
+        delivery = connection.execute(text(delivery_sql), {
+            **params, "activity_type": "delivery", "category": WorkerCategory.DELIVERY_WORKER.name
+        })
+        transaction = connection.execute(text(transaction_sql), {
+            **params, "activity_type": "transaction", "category": WorkerCategory.AEPS_AGENT.name
+        })
+    
+    print(f"  [OK] Generated {delivery.rowcount} delivery activities")
+    print(f"  [OK] Generated {transaction.rowcount} transaction activities")
+    print("\n" + "="*60)
+    print(f"[OK] Successfully added {delivery.rowcount + transaction.rowcount} activity records")
+    print("="*60)
+
 def main():
     print("\n" + "="*70)
     print("         WORKER ACTIVITIES TABLE CREATION & DATA POPULATION")
     print("="*70)
     
-    # Create engine
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
+    engine = get_script_engine()
     
     try:
         # Step 1: Create table
         create_table(engine)
         
-        # Step 2: Populate with dummy data
-        populate_dummy_data(db)
+        # Step 2: Populate with dummy data (--server-side generates it in MySQL 8 instead)
+        if "--server-side" in sys.argv:
+            populate_dummy_data_server_side(engine)
+        else:
+            populate_dummy_data(engine)
         
         print("\n" + "="*70)
         print("[OK] MIGRATION COMPLETE!")
@@ -220,13 +341,14 @@ def main():
         
     except Exception as e:
         print(f"\n[ERROR] {str(e)}")
-        db.rollback()
         import traceback
         traceback.print_exc()
-    
-    finally:
-        db.close()
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if "--verbose" in sys.argv else logging.INFO,
+        stream=sys.stdout,
+        format="%(message)s"
+    )
     main()
 
@@ -3,81 +3,111 @@ Fix QR code URL in database for workers who have QR code files but no database e
 """
 import sys
 import os
+import logging
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import literal, update
 from app.models import Worker, VerificationStatus
-from app.database import DATABASE_URL
+from app.database import session_scope
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Per-worker details are DEBUG (--verbose); INFO gets a progress line this often
+PROGRESS_EVERY = 1000
+
+# Worker ids per UPDATE ... WHERE id IN (...) statement
+UPDATE_CHUNK_SIZE = 1000
+
+VERIFY_URL_PREFIX = "https://jansuraksha.gov.in/verify?id="
+
+# Both columns derive from worker_id, so one set-based UPDATE fixes any number of rows
+FIX_QR_VALUES = {
+    Worker.qr_code_url: literal("uploads/qrcodes/") + Worker.worker_id + literal(".png"),
+    Worker.verification_endpoint: literal(VERIFY_URL_PREFIX) + Worker.worker_id,
+}
+
 def fix_qr_code_urls():
     """Fix QR code URLs for verified workers"""
     print("\n" + "="*60)
     print("FIX: Update QR Code URLs in Database")
     print("="*60 + "\n")
     
-    # Create database session
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
-    
-    try:
-        # Find all verified workers with worker_id
-        workers = db.query(Worker).filter(
-            Worker.verification_status == VerificationStatus.VERIFIED,
-            Worker.worker_id.isnot(None)
-        ).all()
-        
-        print(f"Found {len(workers)} verified workers")
-        print("-" * 60)
-        
-        updated_count = 0
-        for worker in workers:
-            print(f"\nWorker ID: {worker.worker_id}")
-            print(f"  Internal ID: {worker.id}")
-            print(f"  Current qr_code_url: {worker.qr_code_url}")
-            print(f"  Current verification_endpoint: {worker.verification_endpoint}")
+    with session_scope() as db:
+        try:
+            # Find all verified workers with worker_id (only the columns used below)
+            workers = db.query(
+                Worker.id, Worker.worker_id, Worker.qr_code_url, Worker.verification_endpoint
+            ).filter(
+                Worker.verification_status == VerificationStatus.VERIFIED,
+                Worker.worker_id.isnot(None)
+            ).all()
             
-            # Check if QR code file exists
-            qr_file_path = f"uploads/qrcodes/{worker.worker_id}.png"
-            full_path = Path(__file__).parent.parent / qr_file_path
+            print(f"Found {len(workers)} verified workers")
+            print("-" * 60)
             
-            if full_path.exists():
-                print(f"  ✓ QR Code file exists: {qr_file_path}")
+            # List the QR directory once instead of stat-ing a path per worker
+            qr_dir = Path(__file__).parent.parent / "uploads/qrcodes"
+            try:
+                with os.scandir(qr_dir) as entries:
+                    existing_files = {entry.name for entry in entries if entry.is_file()}
+            except FileNotFoundError:
+                existing_files = set()
+            
+            fixed_ids = []
+            for checked, worker in enumerate(workers, 1):
+                logger.debug("\nWorker ID: %s (internal ID %s)", worker.worker_id, worker.id)
+                logger.debug("  Current qr_code_url: %s", worker.qr_code_url)
+                logger.debug("  Current verification_endpoint: %s", worker.verification_endpoint)
+                
+                # Check if QR code file exists
+                qr_file_name = f"{worker.worker_id}.png"
+                qr_file_path = f"uploads/qrcodes/{qr_file_name}"
                 
-                # Update database fields
-                worker.qr_code_url = qr_file_path
-                worker.verification_endpoint = f"https://jansuraksha.gov.in/verify?id={worker.worker_id}"
+                if qr_file_name in existing_files:
+                    logger.debug("  ✓ QR Code file exists: %s", qr_file_path)
+                    
+                    # Queue the worker for the set-based update
+                    fixed_ids.append(worker.id)
+                    
+                    logger.debug("  ✓ Updated qr_code_url to: %s", qr_file_path)
+                    logger.debug("  ✓ Updated verification_endpoint to: %s%s", VERIFY_URL_PREFIX, worker.worker_id)
+                else:
+                    logger.warning("  ✗ %s: QR Code file NOT found at: %s", worker.worker_id, qr_file_path)
                 
-                print(f"  ✓ Updated qr_code_url to: {worker.qr_code_url}")
-                print(f"  ✓ Updated verification_endpoint to: {worker.verification_endpoint}")
-                updated_count += 1
+                if checked % PROGRESS_EVERY == 0:
+                    logger.info("  ... checked %d/%d workers", checked, len(workers))
+            
+            # Apply all updates with one UPDATE per chunk of ids and commit
+            if fixed_ids:
+                for start in range(0, len(fixed_ids), UPDATE_CHUNK_SIZE):
+                    db.execute(
+                        update(Worker)
+                        .where(Worker.id.in_(fixed_ids[start:start + UPDATE_CHUNK_SIZE]))
+                        .values(FIX_QR_VALUES)
+                        .execution_options(synchronize_session=False)
+                    )
+                db.commit()
+                print("\n" + "="*60)
+                print(f"✓ Successfully updated {len(fixed_ids)} worker records")
+                print("="*60)
+                print("\nQR codes should now be visible in the dashboard!")
             else:
-                print(f"  ✗ QR Code file NOT found at: {qr_file_path}")
-        
-        # Commit changes
-        if updated_count > 0:
-            db.commit()
-            print("\n" + "="*60)
-            print(f"✓ Successfully updated {updated_count} worker records")
-            print("="*60)
-            print("\nQR codes should now be visible in the dashboard!")
-        else:
-            print("\n" + "="*60)
-            print("No updates needed - all records are correct")
-            print("="*60)
-        
-    except Exception as e:
-        print(f"\n✗ ERROR: {str(e)}")
-        db.rollback()
-        raise
-    
-    finally:
-        db.close()
+                print("\n" + "="*60)
+                print("No updates needed - all records are correct")
+                print("="*60)
+            
+        except Exception as e:
+            print(f"\n✗ ERROR: {str(e)}")
+            raise
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if "--verbose" in sys.argv else logging.INFO,
+        stream=sys.stdout,
+        format="%(message)s"
+    )
     fix_qr_code_urls()
 
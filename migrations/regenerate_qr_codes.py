@@ -9,78 +9,98 @@ Run this script to ensure all verified workers have QR codes.
 """
 import sys
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from app.models import Worker, VerificationStatus, WorkerStatus
-from app.database import DATABASE_URL
+from app.database import session_scope
 from app.services.qr_service import qr_service
 
+logger = logging.getLogger(__name__)
+
+# Per-worker details are DEBUG (--verbose); INFO gets a progress line this often
+PROGRESS_EVERY = 1000
+
+def _generate_qr(worker):
+    """Generate one worker's QR code; returns (worker, update mapping or None, error or None)"""
+    try:
+        mapping = {
+            'id': worker.id,
+            'qr_code_url': qr_service.generate_worker_qr(worker.worker_id, overwrite=True),
+            'verification_endpoint': qr_service.generate_verification_endpoint(worker.worker_id)
+        }
+        return worker, mapping, None
+    except Exception as e:
+        return worker, None, e
+
 def regenerate_qr_codes():
     """Generate QR codes for all verified workers without them"""
     print("\n" + "="*60)
     print("MIGRATION: Regenerate QR Codes for Verified Workers")
     print("="*60 + "\n")
     
-    # Create database session
-    engine = create_engine(DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
-    
-    try:
-        # Find all verified workers without QR codes
-        workers = db.query(Worker).filter(
-            Worker.verification_status == VerificationStatus.VERIFIED,
-            Worker.worker_id.isnot(None),
-            Worker.qr_code_url.is_(None)
-        ).all()
-        
-        print(f"Found {len(workers)} verified workers without QR codes")
-        print("-" * 60)
-        
-        if len(workers) == 0:
-            print("✓ All verified workers already have QR codes!")
-            print("✓ No action needed.")
-            return
-        
-        # Generate QR code for each verified worker
-        generated_count = 0
-        for worker in workers:
-            print(f"\nWorker Internal ID: {worker.id}")
-            print(f"  - Worker ID: {worker.worker_id}")
-            print(f"  - Category: {worker.category.value if worker.category else 'N/A'}")
-            print(f"  - Status: {worker.status.value if worker.status else 'N/A'}")
+    with session_scope() as db:
+        try:
+            # Find all verified workers without QR codes (only the columns used below)
+            workers = db.query(
+                Worker.id, Worker.worker_id, Worker.category, Worker.status
+            ).filter(
+                Worker.verification_status == VerificationStatus.VERIFIED,
+                Worker.worker_id.isnot(None),
+                Worker.qr_code_url.is_(None)
+            ).all()
             
-            # Generate QR Code
-            try:
-                worker.qr_code_url = qr_service.generate_worker_qr(worker.worker_id)
-                worker.verification_endpoint = qr_service.generate_verification_endpoint(worker.worker_id)
-                print(f"  ✓ QR Code Generated: {worker.qr_code_url}")
-                print(f"  ✓ Verification Endpoint: {worker.verification_endpoint}")
-                generated_count += 1
-            except Exception as e:
-                print(f"  ✗ ERROR generating QR code: {str(e)}")
-        
-        # Commit changes
-        db.commit()
-        
-        print("\n" + "="*60)
-        print(f"✓ Successfully generated {generated_count} QR codes")
-        print("="*60)
-        print("\nQR codes are now available for all verified workers.")
-        
-    except Exception as e:
-        print(f"\n✗ ERROR: {str(e)}")
-        db.rollback()
-        raise
-    
-    finally:
-        db.close()
+            print(f"Found {len(workers)} verified workers without QR codes")
+            print("-" * 60)
+            
+            if len(workers) == 0:
+                print("✓ All verified workers already have QR codes!")
+                print("✓ No action needed.")
+                return
+            
+            # Generate QR codes in parallel (PNG encoding and file writes), report in order
+            mappings = []
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for done, (worker, mapping, error) in enumerate(executor.map(_generate_qr, workers), 1):
+                    if done % PROGRESS_EVERY == 0:
+                        logger.info("  ... processed %d/%d workers", done, len(workers))
+                    
+                    logger.debug("\nWorker Internal ID: %s", worker.id)
+                    logger.debug("  - Worker ID: %s", worker.worker_id)
+                    logger.debug("  - Category: %s", worker.category.value if worker.category else 'N/A')
+                    logger.debug("  - Status: %s", worker.status.value if worker.status else 'N/A')
+                    
+                    if error:
+                        logger.warning("  ✗ %s: ERROR generating QR code: %s", worker.worker_id, error)
+                        continue
+                    logger.debug("  ✓ QR Code Generated: %s", mapping['qr_code_url'])
+                    logger.debug("  ✓ Verification Endpoint: %s", mapping['verification_endpoint'])
+                    mappings.append(mapping)
+            
+            # Save all generated QR codes in one batch and commit
+            if mappings:
+                db.bulk_update_mappings(Worker, mappings)
+            db.commit()
+            
+            print("\n" + "="*60)
+            print(f"✓ Successfully generated {len(mappings)} QR codes")
+            print("="*60)
+            print("\nQR codes are now available for all verified workers.")
+            
+        except Exception as e:
+            print(f"\n✗ ERROR: {str(e)}")
+            raise
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG if "--verbose" in sys.argv else logging.INFO,
+        stream=sys.stdout,
+        format="%(message)s"
+    )
+    
     print("\n⚠️  This will generate QR codes for verified workers who don't have them yet.")
     print("This is safe to run and will not affect existing QR codes.\n")
     
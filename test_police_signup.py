@@ -1,6 +1,7 @@
 """
 Test script to verify automatic police officer profile creation during signup
 """
+import os
 import requests
 import json
 
@@ -11,9 +12,12 @@ def test_police_signup():
     
     print("\n🧪 Testing Police Officer Signup with Auto Profile Creation...\n")
     
+    # One keep-alive session for every step
+    session = requests.Session()
+    
     # 1. Request OTP
     print("1️⃣  Requesting OTP for mobile...")
-    otp_response = requests.post(
+    otp_response = session.post(
         f"{BASE_URL}/api/auth/request-otp",
         json={
             "mobile": "+919876543210",
@@ -23,12 +27,13 @@ def test_police_signup():
     print(f"   Status: {otp_response.status_code}")
     print(f"   Response: {json.dumps(otp_response.json(), indent=2)}")
     
-    # For testing, the OTP is printed in console, use: 123456 (default test OTP)
-    otp = input("\n   Enter OTP from console: ")
+    # Run the backend with APP_ENV=test and TEST_OTP=<code> (and export TEST_OTP here)
+    # to skip the prompt; otherwise the OTP is printed in the backend console
+    otp = os.environ.get("TEST_OTP") or input("\n   Enter OTP from console: ")
     
     # 2. Sign up as police officer
     print("\n2️⃣  Signing up as Police Officer...")
-    signup_response = requests.post(
+    signup_response = session.post(
         f"{BASE_URL}/api/auth/signup",
         json={
             "full_name": "Officer Test Kumar",
@@ -48,10 +53,8 @@ def test_police_signup():
         # 3. Get police officer profile
         print("\n3️⃣  Fetching Police Officer Profile...")
         token = signup_data.get('access_token')
-        profile_response = requests.get(
-            f"{BASE_URL}/api/police/me",
-            headers={"Authorization": f"Bearer {token}"}
-        )
+        session.headers["Authorization"] = f"Bearer {token}"
+        profile_response = session.get(f"{BASE_URL}/api/police/me")
         print(f"   Status: {profile_response.status_code}")
         
         if profile_response.status_code == 200:
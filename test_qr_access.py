@@ -8,28 +8,33 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from app.models import Worker, VerificationStatus
-from app.database import DATABASE_URL
+from app.database import session_scope
 
 print("\n" + "="*60)
 print("QR CODE VERIFICATION TEST")
 print("="*60 + "\n")
 
-# Create database session
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-db = SessionLocal()
-
-try:
-    # Find verified workers
-    workers = db.query(Worker).filter(
+with session_scope() as db:
+    # Find verified workers (only the columns printed below, streamed in batches)
+    workers = db.query(
+        Worker.worker_id, Worker.qr_code_url, Worker.verification_endpoint
+    ).filter(
         Worker.verification_status == VerificationStatus.VERIFIED,
         Worker.worker_id.isnot(None)
-    ).all()
+    ).yield_per(1000)
+    
+    # List the QR directory once (path -> stat) instead of stat-ing a path per worker
+    qr_dir = Path(__file__).parent / "uploads" / "qrcodes"
+    try:
+        with os.scandir(qr_dir) as entries:
+            existing_files = {entry.path: entry.stat() for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        existing_files = {}
     
+    found = False
     for worker in workers:
+        found = True
         print(f"Worker ID: {worker.worker_id}")
         print(f"  Database qr_code_url: {worker.qr_code_url}")
         print(f"  Verification endpoint: {worker.verification_endpoint}")
@@ -37,9 +42,10 @@ try:
         if worker.qr_code_url:
             # Check if file exists
             file_path = Path(__file__).parent / worker.qr_code_url
-            if file_path.exists():
+            file_stat = existing_files.get(str(file_path))
+            if file_stat is not None:
                 print(f"  [OK] QR Code file EXISTS at: {file_path}")
-                print(f"  [OK] File size: {file_path.stat().st_size} bytes")
+                print(f"  [OK] File size: {file_stat.st_size} bytes")
                 print(f"  [OK] Access URL: http://localhost:8000/{worker.qr_code_url}")
             else:
                 print(f"  [ERROR] QR Code file NOT FOUND at: {file_path}")
@@ -48,11 +54,8 @@ try:
         
         print()
     
-    if not workers:
+    if not found:
         print("No verified workers found in database")
-    
-finally:
-    db.close()
 
 print("="*60)
 print("TEST COMPLETE")
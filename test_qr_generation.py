@@ -23,7 +23,7 @@ print(f"Generating QR code for worker: {test_worker_id}")
 
 try:
     # Generate QR code
-    qr_path = qr_service.generate_worker_qr(test_worker_id)
+    qr_path = qr_service.generate_worker_qr(test_worker_id, overwrite=True)
     verification_endpoint = qr_service.generate_verification_endpoint(test_worker_id)
     
     print(f"\n✅ QR Code Generated Successfully!")